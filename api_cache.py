@@ -0,0 +1,94 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class ResponseCache:
+    """Persistent SQLite cache for API responses with a time to live and least recently used eviction."""
+
+    def __init__(self, filename, ttl, max_bytes):
+        self.filename = filename
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._connection = None
+        self._lock = threading.Lock() # The connection is shared between threads, only one may use it at a time
+
+    def _connect(self):
+        """Open the database on first use so importing the game doesn't touch the disk."""
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.filename, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, body TEXT NOT NULL, size INTEGER NOT NULL, "
+                "fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        return self._connection
+
+    def get(self, url, allow_stale=False):
+        """Get a cached response, expired responses are only returned when allow_stale is True.
+        :return: The cached JSON data, None when the url is not cached.
+        """
+        with self._lock:
+            try:
+                connection = self._connect()
+                row = connection.execute("SELECT body, fetched_at FROM responses WHERE url = ?", (url,)).fetchone()
+                if row is None:
+                    return None
+
+                body, fetched_at = row
+                now = time.time()
+                if not allow_stale and now - fetched_at > self.ttl:
+                    return None
+
+                # Mark the response as recently used so it's evicted last
+                connection.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (now, url))
+                connection.commit()
+            except sqlite3.Error:
+                return None
+
+        return json.loads(body)
+
+    def put(self, url, data):
+        """Store a response in the cache and evict the least recently used responses when it's too big."""
+        body = json.dumps(data, separators=(',', ':'))
+        now = time.time()
+        with self._lock:
+            try:
+                connection = self._connect()
+                connection.execute(
+                    "INSERT OR REPLACE INTO responses (url, body, size, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (url, body, len(body), now, now)
+                )
+                self._evict(connection)
+                connection.commit()
+            except sqlite3.Error:
+                pass # The cache is only an optimization, the game works without it
+
+    def _evict(self, connection):
+        """Delete the least recently used responses until the cache fits in max_bytes."""
+        total_size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+
+        freed = 0
+        expired = []
+        for url, size in connection.execute("SELECT url, size FROM responses ORDER BY accessed_at"):
+            if total_size - freed <= self.max_bytes:
+                break
+            expired.append((url,))
+            freed += size
+        connection.executemany("DELETE FROM responses WHERE url = ?", expired)
+
+    def clear(self):
+        """Remove all the cached responses."""
+        with self._lock:
+            try:
+                connection = self._connect()
+                connection.execute("DELETE FROM responses")
+                connection.commit()
+            except sqlite3.Error:
+                pass
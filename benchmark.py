@@ -0,0 +1,224 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+GAME_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+def parse_import_times(output):
+    """Parse the output of python -X importtime.
+    :return: Dictionary with the module name and its (self, cumulative) import time in microseconds.
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_time, cumulative_time, module = line[len('import time:'):].split('|')
+        modules[module.strip()] = (int(self_time), int(cumulative_time))
+    return modules
+
+def benchmark_import_time(runs=5):
+    """Measure how long importing the game takes with python -X importtime, and which modules are the slowest."""
+    game_modules = [name[:-3] for name in os.listdir(GAME_DIRECTORY) if name.endswith('.py')]
+    totals = []
+    slowest = {}
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                                cwd=GAME_DIRECTORY, capture_output=True, text=True)
+        modules = parse_import_times(result.stderr)
+        totals.append(modules['main'][1])
+        for module, (self_time, cumulative_time) in modules.items():
+            slowest[module] = min(cumulative_time, slowest.get(module, cumulative_time))
+
+    print(f"import main: {min(totals) / 1000:.1f} ms (best of {runs}), {statistics.median(totals) / 1000:.1f} ms median")
+    print("Slowest game modules (cumulative):")
+    for module in sorted((module for module in slowest if module in game_modules), key=slowest.get, reverse=True)[:10]:
+        print(f"  {module:<20} {slowest[module] / 1000:.1f} ms")
+
+def benchmark_first_prompt(runs=5):
+    """Measure the time from starting python main.py until the first prompt is shown, in an empty directory."""
+    timings = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            process = subprocess.Popen([sys.executable, os.path.join(GAME_DIRECTORY, 'main.py')], cwd=directory,
+                                       stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            output = b''
+            # A new player is asked for their name first, input() flushes the prompt before waiting
+            while b'name?' not in output:
+                chunk = os.read(process.stdout.fileno(), 4096)
+                if not chunk:
+                    break
+                output += chunk
+            timings.append(time.perf_counter() - start)
+            process.kill()
+            process.wait()
+
+    print(f"python main.py to the first prompt: {min(timings) * 1000:.1f} ms (best of {runs}), "
+          f"{statistics.median(timings) * 1000:.1f} ms median")
+
+def benchmark_startup(runs=5):
+    """Measure the import time and the time until the game asks the first question."""
+    benchmark_import_time(runs)
+    benchmark_first_prompt(runs)
+
+def benchmark_sessions(runs=5):
+    """Measure how many steps per second the headless bot sessions play, on one core and on all cores."""
+    from game import play_bot_session, run_sessions, print_run_report
+
+    timings = [play_bot_session(seed, 2000)['elapsed'] for seed in range(runs)]
+    print(f"One session of 2000 steps: {min(timings) * 1000:.1f} ms (best of {runs}), "
+          f"{statistics.median(timings) * 1000:.1f} ms median")
+    print_run_report(run_sessions(runs * 10, 2000))
+
+MAP_GENERATION_SIZES = [(7, 20), (100, 100), (500, 500), (1000, 1000), (2000, 2000)] # Rows and columns
+
+def benchmark_map_generation(runs=5):
+    """Measure how long generating the grassland and the beach takes for small to very big maps."""
+    from map import generate_map
+
+    for rows, cols in MAP_GENERATION_SIZES:
+        position = [rows // 2, cols // 2] # The forest of the beach spawns where the player arrives
+        for map_type in ('grassland', 'beach'):
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                generate_map(rows, cols, map_type, 0.4, position)
+                timings.append(time.perf_counter() - start)
+            print(f"{map_type:<10} {rows}x{cols}: {min(timings) * 1000:.1f} ms (best of {runs}), "
+                  f"{statistics.median(timings) * 1000:.1f} ms median")
+
+RENDER_MAP_SIZES = [(7, 20), (7, 50), (30, 100)] # Rows and columns
+RENDER_MOVES = 200 # Moves drawn per measurement
+RENDER_SCREEN_SIZE = (200, 400) # Lines and columns of the screen, big enough for the whole map of RENDER_MAP_SIZES
+VIEWPORT_MAP_SIZES = [(100, 100), (1000, 1000), (2000, 2000)] # Maps that are drawn around the player on a terminal
+VIEWPORT_SCREEN_SIZE = (40, 120)
+
+def print_map_per_tile(map, position, skin):
+    """Draw the map with one print per tile, how display_map drew the map before the renderer."""
+    for r in range(map.rows):
+        for c in range(map.cols):
+            if [r, c] == position:
+                print(skin, end='')
+            else:
+                print(map.emoji(r, c), end=' ')
+        print()
+
+def walk_positions(rows, cols):
+    """Get the positions of a walk to the right through the middle of the map, one for every move."""
+    return [[rows // 2, 1 + move % (cols - 2)] for move in range(RENDER_MOVES)]
+
+def time_renderer(renderer, map, positions):
+    """Measure the time the renderer takes to draw the map after a move."""
+    start = time.perf_counter()
+    for position in positions:
+        renderer.draw_map(map, position, '🧍')
+    return (time.perf_counter() - start) / RENDER_MOVES
+
+def benchmark_render(runs=5):
+    """Measure the time to draw the map after a move: the whole map with one print per tile and with the renderer, and
+    the view around the player on maps that don't fit on the terminal."""
+    from contextlib import redirect_stdout
+    from map import generate_map
+    from render import Renderer
+
+    for rows, cols in RENDER_MAP_SIZES:
+        map = generate_map(rows, cols, 'grassland')
+        positions = walk_positions(rows, cols)
+        with open(os.devnull, 'w', encoding='utf-8') as output, redirect_stdout(output):
+            timings = {'per tile': [], 'renderer': []}
+            for _ in range(runs):
+                start = time.perf_counter()
+                for position in positions:
+                    print_map_per_tile(map, position, '🧍')
+                timings['per tile'].append((time.perf_counter() - start) / RENDER_MOVES)
+
+                timings['renderer'].append(time_renderer(Renderer(output, True, RENDER_SCREEN_SIZE), map, positions))
+
+        per_tile, rendered = min(timings['per tile']), min(timings['renderer'])
+        print(f"{rows}x{cols}: per tile {per_tile * 1e6:.0f} us, renderer {rendered * 1e6:.0f} us per move "
+              f"({per_tile / rendered:.0f}x faster, best of {runs})")
+
+    for rows, cols in VIEWPORT_MAP_SIZES:
+        map = generate_map(rows, cols, 'grassland')
+        with open(os.devnull, 'w', encoding='utf-8') as output:
+            timings = [time_renderer(Renderer(output, True, VIEWPORT_SCREEN_SIZE), map, walk_positions(rows, cols))
+                       for _ in range(runs)]
+        print(f"{rows}x{cols} in a {VIEWPORT_SCREEN_SIZE[0]}x{VIEWPORT_SCREEN_SIZE[1]} terminal with the minimap: "
+              f"{min(timings) * 1e6:.0f} us per move (best of {runs})")
+
+PATHFINDING_SIZE = (1000, 1000) # Rows and columns of the maps the walks are found on
+PATHFINDING_TREE_DENSITIES = [0.2, 0.3] # Maps with trees scattered all over them, so the walks have to go around
+
+def make_tree_map(rows, cols, density, seed=0):
+    """Make a map with trees on random tiles and a 🏪 in the middle, with the corners free to walk from and to."""
+    import random
+    from tile_grid import TileGrid, TREE, EMPTY, POKEMART
+
+    rng = random.Random(seed)
+    map = TileGrid(rows, cols, bytes(TREE if rng.random() < density else EMPTY for _ in range(rows * cols)))
+    map.changes = {}
+    for row, col in ((1, 1), (rows - 2, cols - 2)):
+        map.set(row, col, EMPTY)
+    map.set(rows // 2, cols // 2, POKEMART)
+    return map
+
+def benchmark_pathfinding(runs=5):
+    """Measure how long finding a walk across a 1000x1000 map takes with A*, and finding the nearest 🏪 with a distance
+    field: computing it, and looking it up again after items spawned on the map."""
+    from map import generate_map
+    from pathfinding import find_path, DistanceFields
+    from tile_grid import POKEMART, EGG, EMPTY
+
+    rows, cols = PATHFINDING_SIZE
+    maps = {'grassland': generate_map(rows, cols, 'grassland', 0.4, seed=0)}
+    for density in PATHFINDING_TREE_DENSITIES:
+        maps[f'{density:.0%} trees'] = make_tree_map(rows, cols, density)
+
+    start_position, goal = [1, 1], [rows - 2, cols - 2]
+    for name, map in maps.items():
+        timings = {'path': [], 'field': [], 'lookup': []}
+        for _ in range(runs):
+            start = time.perf_counter()
+            path = find_path(map, start_position, goal)
+            timings['path'].append(time.perf_counter() - start)
+
+            fields = DistanceFields()
+            start = time.perf_counter()
+            field = fields.get(map, POKEMART, start_position)
+            timings['field'].append(time.perf_counter() - start)
+
+            for row, col in map.positions_of(EMPTY)[:10]:
+                map.set(row, col, EGG) # Items on the open path don't block the way, the field stays right
+            start = time.perf_counter()
+            fields.get(map, POKEMART, start_position).find_path(start_position)
+            timings['lookup'].append(time.perf_counter() - start)
+
+        print(f"{name:<12} {rows}x{cols}: A* {min(timings['path']) * 1000:.1f} ms ({len(path)} steps), "
+              f"distance field {min(timings['field']) * 1000:.1f} ms ({field.get_steps(start_position)} steps to the 🏪), "
+              f"lookup and walk {min(timings['lookup']) * 1000:.2f} ms (best of {runs})")
+
+BENCHMARKS = {
+    'startup': benchmark_startup,
+    'sessions': benchmark_sessions,
+    'map_generation': benchmark_map_generation,
+    'render': benchmark_render,
+    'pathfinding': benchmark_pathfinding,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for Pokémon Catch.")
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS) + ['all'], help="Benchmark to run")
+    parser.add_argument('--runs', type=int, default=5, help="Number of times every measurement is repeated")
+    args = parser.parse_args()
+
+    for name, benchmark in BENCHMARKS.items():
+        if args.benchmark in (name, 'all'):
+            print(f"\n== {name} ==")
+            benchmark(args.runs)
+
+if __name__ == '__main__':
+    main()
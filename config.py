@@ -1,7 +1,77 @@
+import os
+
 POKEAPI_BASE_URL = 'https://pokeapi.co/api/v2/'
 
+# Persistent cache for the PokeAPI responses, so the same data isn't downloaded again every session
+API_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pokeapi_cache.sqlite3') # Next to the game
+API_CACHE_TTL = 60 * 60 * 24 * 30 # Keep responses for 30 days, the Pokémon data rarely changes
+API_CACHE_MAX_BYTES = 50 * 1024 * 1024 # Evict the least recently used responses when the cache grows above 50 MB
+API_OFFLINE_MODE = os.environ.get('POKEMON_OFFLINE', '').strip().lower() in ('1', 'true', 'yes') # Only serve from the cache
+
+# HTTP client settings for the PokeAPI
+API_CONNECT_TIMEOUT = 3.05 # Seconds to wait for a connection to the PokeAPI
+API_READ_TIMEOUT = 10 # Seconds to wait for the PokeAPI to send the response
+API_POOL_SIZE = 10 # Keep-alive connections kept open, so not every request pays for a new TCP and TLS handshake
+API_MAX_RETRIES = 3 # Retries for a failed request before giving up
+API_RETRY_BACKOFF = 0.5 # Seconds to wait before the first retry, doubled on every next retry with a random jitter
+API_CIRCUIT_BREAKER_THRESHOLD = 3 # Failed requests in a row before the PokeAPI is considered unreachable
+API_CIRCUIT_BREAKER_COOLDOWN = 30 # Seconds to play without the PokeAPI before trying to reach it again
+
+# Seed for all the random numbers of a session, set POKEMON_SEED to replay the same session
+try:
+    RANDOM_SEED = int(os.environ.get('POKEMON_SEED', ''))
+except ValueError: # Not set or not a number, the session isn't seeded
+    RANDOM_SEED = None
+
+# How long the game waits between messages: interactive, fast or headless (never waits), set with POKEMON_PACING
+PACING_MODE = os.environ.get('POKEMON_PACING', 'interactive').strip().lower()
+
+# Print what happens behind the scenes, like how often the player waited for the wild Pokémon, set with POKEMON_DEBUG
+DEBUG_MODE = os.environ.get('POKEMON_DEBUG', '').strip().lower() in ('1', 'true', 'yes')
+POKEMON_LIST_MAX_DELAY = 1 # Seconds the rows of the Pokémon list take to scroll by at most, also for big collections
+
+ENCOUNTER_CHANCE = 30 # Chance in percent to encounter a wild Pokémon on every step in the grass or water
+
+# Chances of the events of the world on every tick, the world advances a tick with every command of the player
+SPAWN_CHANCE = 0.1 # An egg or coins spawn on the grassland, when there are none
+HATCH_CHANCE = 0.025 # An egg in the bag hatches while the player is on the grassland
+GROW_CHANCE = 0.1 # A planted seed on the grassland grows into a berry
+
+# Size of the maps in tiles, the maps are generated with NumPy so big maps take well under a second
+MAP_DEFAULT_SIZE = (7, 20) # Rows and columns
+MAP_MIN_HEIGHT = 5
+MAP_MAX_HEIGHT = 2000
+MAP_MIN_WIDTH = 10
+MAP_MAX_WIDTH = 2000
+
+# Maps that don't fit on the terminal are drawn around the player, with a minimap of the whole map below them
+VIEWPORT_MIN_SIZE = (5, 10) # Rows and columns that are drawn at least, also on a small terminal
+SHOW_MINIMAP = True
+MINIMAP_SIZE = (6, 20) # Rows and columns of the minimap at most, every tile of it stands for a part of the map
+
+# The endless world is generated in square chunks of tiles when the player comes near them
+WORLD_CHUNK_SIZE = 32 # Rows and columns of a chunk
+WORLD_SIZE_IN_CHUNKS = 65536 # Chunks in every direction, 2 million tiles is endless enough to walk
+WORLD_MAX_LOADED_CHUNKS = 64 # Chunks kept in memory, the least recently used chunk is written to disk when it changed
+WORLD_CHUNK_MAX_GROVES = 3 # Groves of trees in a grassland chunk at most
+WORLD_CHUNK_GROVE_RADIUS = 3 # Tiles from the middle of a grove to its edge at most
+WORLD_CHUNK_STRUCTURE_CHANCE = 0.1 # Chance that a grassland chunk has a PokéMart or a Pokémon Center
+
+INACTIVE_MAPS_MAX_TILES = 1_000_000 # Tiles of the maps the player isn't on that are kept in memory, more go to disk
+PORTAL_PREFETCH_DISTANCE = 3 # Tiles from a 🏝️ or 🌲 at which the map behind it is prepared in the background
+
+# Walking to coordinates like 3,12 or to the nearest place, with the (g)o to command
+WALK_DESTINATIONS = {"Poké Mart": "🏪", "Pokémon Center": "⛑️", "Beach": "🏝️", "Grassland": "🌲"}
+WALK_STEP_DELAY = 0.1 # Seconds between the steps of a walk, so the player can follow it
+WALK_INTERACTION_COST = 5 # Steps a walk rather takes than walking over an item or into a building on the way
+PATHFINDING_MAX_NODES = 4_000_000 # Tiles A* looks at before it gives up, all the tiles of the biggest map
+WORLD_WALK_RADIUS = 64 # Tiles around the player in the endless world where walks and the nearest places are found
+
 # Number of wild Pokémon to load in advance to avoid delays during gameplay
 WILD_POKEMON_PRELOAD_COUNT = 10
+WILD_POKEMON_LOW_WATERMARK = 4 # Refill the wild Pokémon in the background when fewer are left
+PRELOAD_MAX_ATTEMPTS_PER_POKEMON = 20 # Give up preloading when the Pokémon can't be loaded, for example offline
+PRELOAD_MAX_IN_FLIGHT = 8 # Random Pokémon checked at the same time while preloading, at most API_POOL_SIZE
 
 GRASS_OBJECTS = ['🌿', '🌾']
 WATER_OBJECTS = ['🫧', '💦']
@@ -16,10 +86,22 @@ SPAWNABLE_OBJECTS += list(set(GROWABLE_BERRIES))
 # add spawnable objects to the interaction objects because they are also interactable
 INTERACTION_OBJECTS += SPAWNABLE_OBJECTS
 
+# All the map tiles, a map stores the index of the tile in this tuple, so only add new tiles at the end
+TILES = ('  ', '🌳', '🌊', '🌿', '🌾', '🫧', '💦', '🏪', '⛑️', '🏠', '🏝️', '🌲', '🥚', '💰', '🍓', '🍋', '🍍', '🌱')
+
+EGG_POOL_SIZE = 5 # Egg hatches resolved in advance and saved with the player, so hatching never waits for the API
+
 LEGENDARY_POKEMON = [144, 145, 146, 150, 151] # 144 is Articuno, 145 is Zapdos, 146 is Moltres, 150 is Mewtwo, 151 is Mew
 
 POKEBALLS = {'Poké Balls': '⛔️', 'Great Balls': '🔵', 'Ultra Balls': '🎱', 'Master Balls': '🔮'}
 
+# Catch rules, shared by the game and the catch simulator
+POKEBALL_CATCH_BONUS = 15 # Catch rate bonus for every next Poké Ball in the order of POKEBALLS
+BREAK_FREE_CHANCE = 55 # Chance in percent that a Pokémon that isn't caught breaks free instead of running away
+MAX_CATCH_RATE = 225 # Berries and eggs can't increase the catch rate above this
+BERRY_CATCH_BONUS = {'Razz Berries': 25, 'Golden Razz Berries': 50, 'Eggs': 10} # Eggs hurt the Pokémon a bit
+SHINY_CHANCE_THRESHOLD = 5 # A Pokémon is shiny when the roll from 0 to the shiny rate of the player is at most this
+
 ITEM_EMOJIS = {
     "Razz Berries": "🍓", # Increases the catch rate
     "Golden Razz Berries": "🍋", # Increases the catch rate significantly
@@ -32,8 +114,20 @@ ITEM_EMOJIS = {
 ITEM_EMOJIS.update(POKEBALLS) # Add the Poké Balls to the item emojis because they are also items
 
 wild_pokemon_file = 'wild_pokemon_list.json'
-wild_grass_pokemon_file = 'wild_grass_pokemon_list.txt'
-wild_water_pokemon_file = 'wild_water_pokemon_list.txt'
+wild_grass_pokemon_file = 'wild_grass_pokemon_list.bin'
+wild_water_pokemon_file = 'wild_water_pokemon_list.bin'
+# Comma separated files from older versions, they are converted to the binary files when loading
+legacy_wild_grass_pokemon_file = 'wild_grass_pokemon_list.txt'
+legacy_wild_water_pokemon_file = 'wild_water_pokemon_list.txt'
+
+# Bundled table with the first-generation species, rebuild it with: python species_data.py
+species_data_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'species.bin') # Next to the game, not in the working directory
+SPECIES_CACHE_SIZE = 151 # Species kept in memory, the least recently used species are forgotten first
+
+# Index of the Pokémon that can be found in the grass and in the water, built once from the PokeAPI
+encounter_index_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'encounter_index.json') # Next to the game
+ENCOUNTER_INDEX_VERSION = 1 # Increase when the encounter methods change, so the index is built again
+ENCOUNTER_INDEX_RETRY_DELAY = 300 # Seconds before building the index is tried again when it failed, for example offline
 
 class TextStyles:
     """Text styles for the console."""
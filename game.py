@@ -0,0 +1,250 @@
+import io
+import os
+import random
+import time
+from collections import deque
+from contextlib import contextmanager, redirect_stdout
+
+from config import ENCOUNTER_CHANCE, POKEBALLS, MAP_DEFAULT_SIZE
+from map import create_maps
+from pacing import PacingClock, use_pacing_clock
+from player import Player
+from pokemon import draw_wild_pokemon, start_encounter, get_encounter_index
+from rng import RandomStreams, use_random_streams, get_random
+
+MOVES = ('w', 'a', 's', 'd')
+
+# Answers for the questions the game asks while there are no queued answers, they always back out of a menu
+HEADLESS_DEFAULT_ANSWERS = (
+    ('(y/n)', 'n'),
+    ('Choose an item from your bag', 'e'), # Exit the bag
+    ('What would you like to get?', 'l'), # Leave the Poké Mart
+    ('Choose an option (letter)', 'l'), # Leave
+    ('Choose an option (number)', '1'),
+)
+HEADLESS_MAX_QUESTIONS = 100 # Questions without a queued answer in one step before the game is considered stuck
+
+TARGET_STEPS_PER_SECOND = 10000 # Bot steps every core should play per second in the soak test
+
+
+class Game:
+    """Headless game session, it takes commands and returns structured events instead of using input() and the screen.
+
+    Every game has its own player, maps, random streams and pacing clock, so many games can be played in one process
+    and a game with the same seed and commands always plays the same.
+    """
+
+    def __init__(self, seed=None, name='Bot', map_size=MAP_DEFAULT_SIZE):
+        self.random_streams = RandomStreams(seed)
+        self.clock = PacingClock('headless') # Records how long the session would have taken for a player
+        self.answers = deque()
+        self.questions = 0
+        self.encounter = None
+        self.steps = 0
+
+        self.player = Player(ask=self.ask, prefetch=False)
+        self.player.get_info()["name"] = name # Not set_name, that loads the save with the name from the disk
+        self.player.get_info()["map_size"] = list(map_size)
+        with self.session():
+            create_maps(self.player)
+
+    @contextmanager
+    def session(self):
+        """Play with the random streams and pacing clock of this game, and capture what the game prints."""
+        output = io.StringIO()
+        with use_random_streams(self.random_streams), use_pacing_clock(self.clock), redirect_stdout(output):
+            yield output
+
+    def answer(self, *answers):
+        """Queue answers for the next questions of the game, like 'y' to pick up the item the player walks into."""
+        self.answers.extend(answers)
+
+    def ask(self, question):
+        """Answer a question of the game with the next queued answer, or with the default answer that backs out."""
+        if self.answers:
+            return str(self.answers.popleft())
+
+        self.questions += 1
+        if self.questions > HEADLESS_MAX_QUESTIONS:
+            raise RuntimeError(f"The game keeps asking without an answer: {question.strip()}")
+
+        for text, answer in HEADLESS_DEFAULT_ANSWERS:
+            if text in question:
+                return answer
+        return ''
+
+    def get_state(self):
+        """Get the state of the game that can change by a command."""
+        info = self.player.get_info()
+        return {
+            'map': info["current_map"],
+            'position': list(info["position"]),
+            'coins': info["coins"],
+            'inventory': dict(info["inventory"]),
+            'pokemon': len(info["pokemon"]),
+            'encounter': self.encounter.state if self.encounter else None,
+        }
+
+    def step(self, command):
+        """Play one command: w/a/s/d to move, e to interact and p to plant a seed. During an encounter the command is the
+        action of the encounter: b to open the bag or r to run, then the name of the item and the nickname when caught.
+        :return: Dictionary with the events, the new state of the game and what the game printed.
+        """
+        self.steps += 1
+        self.questions = 0
+        before = self.get_state()
+        events = []
+
+        with self.session() as output:
+            if self.encounter:
+                self.step_encounter(command, events)
+            else:
+                self.player.advance_world() # Every command is a tick of the world, like in the game loop
+
+                if command in MOVES:
+                    self.move(command, events)
+                elif command == 'e':
+                    events.append({'type': 'interacted', 'interacted': self.player.interact_if_possible(self.player.get_position())})
+                elif command == 'p':
+                    self.player.plant_a_seed()
+                else:
+                    events.append({'type': 'invalid_command', 'command': command})
+
+        after = self.get_state()
+        events += self.get_changes(before, after)
+        return {'events': events, 'state': after, 'output': output.getvalue()}
+
+    def step_encounter(self, command, events):
+        """Play the command as the action in the running encounter."""
+        pokemon_count = len(self.player.get_info()["pokemon"])
+        state = self.encounter.step(command)
+        events.append({'type': 'encounter', 'state': state})
+
+        if len(self.player.get_info()["pokemon"]) > pokemon_count:
+            events.append({'type': 'caught', 'pokemon': self.encounter.pokemon['name'], 'id': self.encounter.pokemon['id']})
+        if self.encounter.is_finished():
+            self.encounter = None
+
+    def move(self, direction, events):
+        """Move the player and roll a wild encounter, like the game loop does after a move."""
+        position = self.player.get_position()
+        if not self.player.move(direction) or self.player.get_position() == position:
+            events.append({'type': 'blocked', 'direction': direction})
+        else:
+            events.append({'type': 'moved', 'position': list(self.player.get_position())})
+
+        if self.player.get_current_map_name() == 'beach':
+            area = 'water' if self.player.is_water() else None
+        else:
+            area = 'grass' if self.player.is_grass() else None
+
+        if area and get_random('encounters').randint(1, 100) <= ENCOUNTER_CHANCE:
+            pokemon = draw_wild_pokemon(area)
+            if pokemon:
+                self.encounter = start_encounter(self.player, pokemon)
+                events.append({'type': 'encounter_started', 'pokemon': pokemon['name'], 'id': pokemon['id'],
+                               'shiny': pokemon.get('shiny', False)})
+
+    def get_changes(self, before, after):
+        """Get the events for the coins, items and map that changed between two states."""
+        events = []
+        if after['map'] != before['map']:
+            events.append({'type': 'map_changed', 'map': after['map']})
+        if after['coins'] != before['coins']:
+            events.append({'type': 'coins', 'change': after['coins'] - before['coins']})
+        for item in sorted(set(before['inventory']) | set(after['inventory'])):
+            change = after['inventory'].get(item, 0) - before['inventory'].get(item, 0)
+            if change:
+                events.append({'type': 'item', 'item': item, 'change': change})
+        return events
+
+
+def choose_bot_command(game, bot_random):
+    """Choose the next command for a bot that walks around randomly and throws its best Poké Ball at every Pokémon."""
+    if game.encounter is None:
+        return bot_random.choice(MOVES)
+
+    pokeballs = [pokeball for pokeball in reversed(POKEBALLS) if game.player.get_inventory_item(pokeball) > 0]
+    if game.encounter.state == 'menu':
+        return 'b' if pokeballs else 'r'
+    elif game.encounter.state == 'bag':
+        return pokeballs[0] if pokeballs else ''
+    return '' # No nickname
+
+def play_bot_session(seed, steps):
+    """Play a game with the bot for the number of steps.
+    :return: Dictionary with the statistics of the session.
+    """
+    start = time.perf_counter()
+    game = Game(seed)
+    bot_random = random.Random(f'{seed}:bot')
+    encounters = caught = 0
+    for _ in range(steps):
+        for event in game.step(choose_bot_command(game, bot_random))['events']:
+            encounters += event['type'] == 'encounter_started'
+            caught += event['type'] == 'caught'
+
+    return {
+        'seed': seed,
+        'steps': steps,
+        'encounters': encounters,
+        'caught': caught,
+        'virtual_time': game.clock.virtual_time,
+        'elapsed': time.perf_counter() - start,
+    }
+
+def run_sessions(sessions, steps, workers=None, seed=0):
+    """Play independent bot sessions at the same time in a pool of processes, the sessions get the seeds seed, seed + 1...
+    :return: Dictionary with the totals and the throughput of all the sessions.
+    """
+    from concurrent.futures import ProcessPoolExecutor # Only the runner needs it
+
+    workers = workers or os.cpu_count() or 1
+    get_encounter_index() # Load or build the index once, instead of in every worker
+    seeds = range(seed, seed + sessions)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(play_bot_session, seeds, [steps] * sessions, chunksize=max(1, sessions // (workers * 4))))
+    elapsed = time.perf_counter() - start
+
+    total_steps = sum(result['steps'] for result in results)
+    busy_time = sum(result['elapsed'] for result in results) # Time the sessions were played, without starting the workers
+    return {
+        'sessions': sessions,
+        'workers': workers,
+        'steps': total_steps,
+        'encounters': sum(result['encounters'] for result in results),
+        'caught': sum(result['caught'] for result in results),
+        'virtual_time': sum(result['virtual_time'] for result in results),
+        'elapsed': elapsed,
+        'steps_per_second': total_steps / elapsed,
+        'steps_per_second_per_core': total_steps / busy_time if busy_time else 0.0,
+    }
+
+def print_run_report(stats):
+    """Print the totals and the throughput of a run."""
+    print(f"Sessions:            {stats['sessions']:,} on {stats['workers']} workers")
+    print(f"Steps:               {stats['steps']:,}")
+    print(f"Encounters:          {stats['encounters']:,} ({stats['caught']:,} caught)")
+    print(f"Played time skipped: {stats['virtual_time'] / 3600:.1f} hours")
+    print(f"Wall time:           {stats['elapsed']:.2f} s")
+    print(f"Steps per second:    {stats['steps_per_second']:,.0f}")
+    per_core = stats['steps_per_second_per_core']
+    print(f"Steps per second per core: {per_core:,.0f} "
+          f"({'meets' if per_core >= TARGET_STEPS_PER_SECOND else 'below'} the target of {TARGET_STEPS_PER_SECOND:,})")
+
+def main():
+    """Soak test: python game.py [--sessions N] [--steps N] [--workers N] [--seed N]"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Play many headless bot sessions in parallel.")
+    parser.add_argument('--sessions', type=int, default=100, help="Number of independent sessions")
+    parser.add_argument('--steps', type=int, default=1000, help="Commands played in every session")
+    parser.add_argument('--workers', type=int, help="Number of processes, the number of cores by default")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the first session")
+    args = parser.parse_args()
+
+    print_run_report(run_sessions(args.sessions, args.steps, args.workers, args.seed))
+
+if __name__ == '__main__':
+    main()
@@ -1,28 +1,23 @@
-import os
-import random
-import time
-
-from config import TextStyles
+from config import TextStyles, ENCOUNTER_CHANCE, WALK_STEP_DELAY, DEBUG_MODE
 from map import display_map, create_maps
+from pacing import pause
 from player import Player, initialize_new_player, load_existing_player
-from pokemon import encounter_pokemon, get_wild_pokemon_list, save_wild_pokemon_list
-
-# Create a new player
-player = Player()
+from pokemon import encounter_pokemon, save_wild_pokemon_list, schedule_wild_pokemon_load, get_wild_pokemon_wait_rate
+from render import clear_screen, invalidate_screen
+from rng import get_random
 
-def clear_screen():
-    """Fake clear the screen"""
-    is_pycharm = "PYCHARM_HOSTED" in os.environ
-    if is_pycharm:
-        print("\n" * 100)
-    else:
-        os.system('cls' if os.name == 'nt' else 'clear')
+def ask_player(question):
+    """Ask the player a question, the menu or message of the question replaces the map on the screen."""
+    invalidate_screen()
+    return input(question)
 
+# Create a new player
+player = Player(ask=ask_player)
 
 def handle_move_input():
     """Handle player move input and game interactions."""
     display_map(player)
-    move = input("Move to: (w/a/s/d) (b)ag (q)uit (m)enu (h)elp ").strip().lower()
+    move = input("Move to: (w/a/s/d) or i,j (g)o to (b)ag (q)uit (m)enu (h)elp ").strip().lower()
 
     if not ',' in move:  # If input is not a coordinate like 1,1, just take the first character
         move = move[0] if len(move) > 0 else move
@@ -49,37 +44,72 @@ def execute_move_action(move):
     elif move == 'h':
         clear_screen()
         player.show_help_menu()
+    elif move == 'g':
+        walk(player.find_path_to_nearest(player.ask_walk_destination()))
+    elif ',' in move:
+        walk(player.find_path_to(move))
     elif player.move(move):
-        if player.get_current_map_name() == 'beach':
-            handle_water_encounter()
-        else:
-            handle_grass_encounter()
+        handle_encounter()
 
     return True
 
+def walk(directions):
+    """Play the steps of a walk one by one, like moves of the player. The walk stops at an encounter, when a step is
+    blocked or when the player travels to another map."""
+    if not directions:
+        return
+
+    map_name = player.get_current_map_name()
+    for step, direction in enumerate(directions):
+        if step:
+            player.advance_world() # Every step of the walk is a tick of the world, like a move
+            display_map(player)
+            pause(WALK_STEP_DELAY)
+
+        position = player.get_position()
+        if not player.move(direction) or player.get_position() == position:
+            break
+        if handle_encounter() or player.get_current_map_name() != map_name:
+            break
+
+def handle_encounter():
+    """Check for an encounter where the player is, in the water on the beach and in the grass on the other maps.
+    :return: True when a wild Pokémon was encountered.
+    """
+    if player.get_current_map_name() == 'beach':
+        return handle_water_encounter()
+    else:
+        return handle_grass_encounter()
+
 def random_encounter():
     """Randomly determine if a wild Pokémon encounter occurs in the grass."""
-    encounter_chance = random.randint(1, 100)
-    return encounter_chance <= 30  # 30% chance to encounter a Pokémon
+    encounter_chance = get_random('encounters').randint(1, 100)
+    return encounter_chance <= ENCOUNTER_CHANCE  # 30% chance to encounter a Pokémon
 
 def handle_grass_encounter():
     """Check for grass encounter and trigger Pokémon battle if applicable."""
     if player.is_grass() and random_encounter():
         clear_screen()
-        time.sleep(0.4)
-        encounter_pokemon(player, get_wild_pokemon_list('grass'), 'grass')
+        pause(0.4)
+        encounter_pokemon(player, 'grass')
+        return True
+    return False
 
 def handle_water_encounter():
     """Check for water encounter and trigger Pokémon battle if applicable."""
     if player.is_water() and random_encounter():
         clear_screen()
-        time.sleep(0.4)
-        encounter_pokemon(player, get_wild_pokemon_list('water'), 'water')
+        pause(0.4)
+        encounter_pokemon(player, 'water')
+        return True
+    return False
 
 def quit_game():
     """Save the game and quit."""
     clear_screen()
     print("Thanks for playing, Goodbye!")
+    if DEBUG_MODE:
+        print(f"The wild Pokémon weren't loaded yet at {get_wild_pokemon_wait_rate():.0%} of the encounters.")
     save_wild_pokemon_list('grass')
     save_wild_pokemon_list('water')
     player.save()
@@ -89,6 +119,7 @@ def game_loop():
     """Main game loop that continuously checks for player input and actions."""
     game_session = True
     while game_session:
+        player.advance_world() # Every command is a tick of the world, the items spawn before the map is drawn
         move = handle_move_input()
         game_session = execute_move_action(move)
 
@@ -99,7 +130,7 @@ def main_menu():
     print("2/(N)ew game")
     print("3/(L)oad existing game")
     print("4/(G)Generate new map")
-    print("5/Set Map Width")
+    print("5/Set Map Size")
     print("6/(H)elp, instructions")
     print("7/(Q)uit game")
     print("8/(B)ack continue playing\n")
@@ -118,6 +149,7 @@ def main_menu():
         player.save()
         return True
     elif choice in [2, 'n']:
+        player.get_maps().clear() # The new game gets new maps, unless the name has a save
         initialize_new_player(player)
     elif choice in [3, 'l']:
         load_existing_player(player)
@@ -125,7 +157,7 @@ def main_menu():
         create_maps(player)
         return True
     elif choice in [5]:
-        player.set_map_width()
+        player.set_map_size()
         create_maps(player)
         return True
     elif choice in [6, 'h']:
@@ -141,7 +173,8 @@ def main_menu():
         print("Invalid choice. Please try again.")
         return main_menu()
 
-    create_maps(player) # Generate new maps for the new game
+    if not player.get_maps():
+        create_maps(player) # Generate new maps for the new game, a loaded game has its own maps
 
     return True
 
@@ -153,7 +186,12 @@ def main():
     else:
         load_existing_player(player)
 
-    create_maps(player)
+    if not player.get_maps():
+        create_maps(player) # A loaded game has its own maps
+
+    # Get the wild Pokémon ready in the background while the player walks to the first grass
+    schedule_wild_pokemon_load('grass')
+    schedule_wild_pokemon_load('water')
 
     print("\nYou can move using W/A/S/D. B to open your bag, H for help, M to open the main menu. and Q to quit the game.\n")
 
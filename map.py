@@ -1,113 +1,197 @@
 import random
-from config import GROWABLE_BERRIES, COLLISION_OBJECTS, INTERACTION_OBJECTS, WATER_OBJECTS
+
+from config import GROWABLE_BERRIES, WATER_OBJECTS, TILES, SPAWN_CHANCE, HATCH_CHANCE, GROW_CHANCE
+from render import draw_map
+from rng import get_random
+from scheduler import ticks_until
+from world import ChunkedWorld
+from tile_grid import TileGrid, TILE_CODES, tile_codes, EMPTY, TREE, WAVE, GRASS_TILE, \
+    POKEMART, POKECENTER, PROFESSOR_HOUSE, ISLAND, FOREST, EGG, COINS, SEED
+
+WATER_TILES = tile_codes(WATER_OBJECTS)
+BERRY_TILES = tile_codes(GROWABLE_BERRIES)
+VECTORIZED_MAP_MIN_TILES = 10_000 # Smaller maps are generated tile by tile, quicker than importing NumPy for them
 
 
 def is_edge_position(r, c, rows, cols):
     """Check if a position is on the edge of the map."""
     return r == 0 or c == 0 or r == rows - 1 or c == cols - 1
 
-def generate_map(rows, cols, map_type='grassland', density=0.4, player=None):
-    """Generates a map with given rows and columns for different map types."""
-    new_map = []
-    grass_positions = []
+def generate_terrain(rows, cols, map_type, density, rng, edges=True):
+    """Generate the tiles of the terrain: the edges and the grass (grassland) or water (beach) inside them. Without edges
+    the grass or water covers all the tiles, for the chunks of the endless world.
+    :return: bytearray with the tile codes, row after row.
+    """
+    if rows * cols < VECTORIZED_MAP_MIN_TILES:
+        return generate_terrain_per_tile(rows, cols, map_type, density, rng, edges)
+    # Imported for the first big map, importing it slows down the start of the game. There's no fallback without NumPy:
+    # it uses the random numbers differently, so a saved map would be generated as another map.
+    import numpy as np
+
+    generator = np.random.default_rng(rng.getrandbits(64)) # Seeded from the map stream, so the maps can be replayed
+    tiles = np.full((rows, cols), EMPTY, dtype=np.uint8) # Open path
+
+    # density is grass density for grasslands.
+    inner = tiles[1:-1, 1:-1] if edges else tiles
+    covered = generator.random(inner.shape) < density
+    if map_type == 'grassland':
+        inner[covered] = GRASS_TILE
+    elif map_type == 'beach':
+        inner[covered] = np.array(WATER_TILES, dtype=np.uint8)[generator.integers(0, len(WATER_TILES), size=int(covered.sum()))]
+
+    if edges:
+        edge = WAVE if map_type == 'beach' else TREE
+        tiles[0, :] = tiles[-1, :] = tiles[:, 0] = tiles[:, -1] = edge
+    return bytearray(tiles.tobytes())
 
+def generate_terrain_per_tile(rows, cols, map_type, density, rng, edges=True):
+    """Generate the terrain like generate_terrain does, tile by tile for small maps."""
+    tiles = bytearray(rows * cols)
     for r in range(rows):
-        row = []
         for c in range(cols):
-            if is_edge_position(r, c, rows, cols):
-                row.append('🌊' if map_type == 'beach' else '🌳')
-            else:
-                # density is grass density for grasslands.
-                if random.random() < density:
-                    if map_type == 'grassland':
-                        row.append('🌿')
-                    elif map_type == 'beach':
-                        row.append(random.choice(WATER_OBJECTS))
-                    grass_positions.append((r, c))
-                else:
-                    row.append('  ')  # Open path
-        # Append the generated row to the map
-        new_map.append(row)
-
-    if map_type == 'grassland' and len(grass_positions) >= 3:
-        place_structures(new_map, grass_positions)
+            if edges and is_edge_position(r, c, rows, cols):
+                tiles[r * cols + c] = WAVE if map_type == 'beach' else TREE
+            elif rng.random() < density:
+                tiles[r * cols + c] = GRASS_TILE if map_type == 'grassland' else rng.choice(WATER_TILES)
+    return tiles
+
+def generate_map(rows, cols, map_type='grassland', density=0.4, position=None, seed=None):
+    """Generates a map with given rows and columns for different map types. The same seed gives the same map, the
+    forest on the beach at the position where the player arrives is kept as the first change.
+    :return: TileGrid with the map.
+    """
+    seed = get_random('map').getrandbits(64) if seed is None else seed
+    rng = random.Random(seed)
+    new_map = TileGrid(rows, cols, generate_terrain(rows, cols, map_type, density, rng))
+
+    if map_type == 'grassland' and new_map.count(GRASS_TILE) >= 3:
+        place_structures(new_map, rng)
 
     if map_type == 'grassland':
-        spawn_beach(new_map)
-    elif map_type == 'beach':
-        spawn_forest(new_map, player)
+        spawn_beach(new_map, rng)
+
+    new_map.generation = {'map_type': map_type, 'density': density, 'seed': seed, 'size': [rows, cols], 'endless': False}
+    new_map.changes = {}
+    if map_type == 'beach' and position:
+        spawn_forest(new_map, position)
 
     return new_map
 
-def place_structures(map, grass_positions):
-    """Place key structures like PokéMart, Pokémon Center, and Professor's house."""
-    pokemart_pos = random.choice(grass_positions)
-    grass_positions.remove(pokemart_pos)
-    pokecenter_pos = random.choice(grass_positions)
-    grass_positions.remove(pokecenter_pos)
-    professor_pos = random.choice(grass_positions)
+def generate_world(map_type='grassland', density=0.4, position=None, seed=None):
+    """Generate an endless world, the chunks are only generated when the player comes near them. The player starts in
+    the middle of a new grassland, a new beach has the forest at the position where the player arrives.
+    :return: ChunkedWorld with the world.
+    """
+    seed = get_random('map').getrandbits(64) if seed is None else seed
+    world = ChunkedWorld(seed, map_type, density)
+
+    if map_type == 'grassland':
+        # The structures and the way to the beach are in the chunk around the middle, where the player starts
+        rng = random.Random(seed)
+        world.set(*world.get_spawn_position(), EMPTY)
+        place_structures(world, rng)
+        position = world.random_position(GRASS_TILE, rng)
+        if position:
+            world.set(*position, ISLAND)
+
+    world.generation = {'map_type': map_type, 'density': density, 'seed': seed, 'endless': True}
+    world.changes = {}
+    if map_type == 'beach' and position:
+        spawn_forest(world, position)
+
+    return world
+
+def create_map(player, map_type, density=0.4, position=None, seed=None):
+    """Generate a map with the size the player chose, or an endless world.
+    :param position: Where the player arrives on the map, the position of the player by default.
+    """
+    position = list(player.get_position()) if position is None else position
+    if player.get_info().get("endless_world"):
+        world = generate_world(map_type, density, position, seed)
+        if map_type == 'grassland':
+            player.get_info()["position"] = world.get_spawn_position()
+        return world
+    rows, cols = player.get_info()["map_size"]
+    return generate_map(rows, cols, map_type, density, position, seed)
+
+def get_map_save(map):
+    """Get how the map was generated and the last tile of every changed position, to save it in the player's file.
+    :return: Dictionary with the generation and the changes as 'row,col,emoji', None for a map that wasn't generated.
+    """
+    if map.generation is None:
+        return None
+
+    return dict(map.generation, changes=[f'{row},{col},{TILES[tile]}' for (row, col), tile in map.changes.items()])
+
+def load_map(map_save):
+    """Generate a saved map again from its seed and replay the changes to it.
+    :return: TileGrid or ChunkedWorld with the map.
+    """
+    if map_save['endless']:
+        map = generate_world(map_save['map_type'], map_save['density'], seed=map_save['seed'])
+    else:
+        rows, cols = map_save['size']
+        map = generate_map(rows, cols, map_save['map_type'], map_save['density'], seed=map_save['seed'])
 
-    map[pokemart_pos[0]][pokemart_pos[1]] = '🏪'
-    map[pokecenter_pos[0]][pokecenter_pos[1]] = '⛑️'
-    map[professor_pos[0]][professor_pos[1]] = '🏠'
+    for change in map_save['changes']:
+        row, col, emoji = change.split(',', 2)
+        map.set(int(row), int(col), TILE_CODES[emoji])
+    return map
 
-def find_empty_positions(map):
-    """Find all empty positions on the map."""
-    return [(r, c) for r in range(len(map)) for c in range(len(map[r])) if map[r][c] == '  ']
+def place_structures(map, rng):
+    """Place key structures like PokéMart, Pokémon Center, and Professor's house on random grass."""
+    for structure in (POKEMART, POKECENTER, PROFESSOR_HOUSE):
+        position = map.random_position(GRASS_TILE, rng) # A placed structure isn't grass anymore, so they never overlap
+        if position:
+            map.set(*position, structure)
 
 def spawn_random_item(map, item_list):
     """Spawn a random item on the map in an empty position."""
-    empty_positions = find_empty_positions(map)
-    if empty_positions:
-        item_pos = random.choice(empty_positions)
-        item = random.choice(item_list)
-        map[item_pos[0]][item_pos[1]] = item
-
-def random_spawn_items(map, player):
-    """Spawn items like egg, coin on a random empty location on the map."""
-    if random.randint(1, 150) <= 15:
-        if random.randint(1, 100) <= 25 and player.get_inventory_item("Eggs") > 0:
-            player.hatch_egg()
-        elif '🥚' not in [item for row in map for item in row] and '💰' not in [item for row in map for item in row]:
-            spawn_random_item(map, ['🥚', '💰', '💰'])
-
-    if random.randint(1, 100) <= 10:
+    rng = get_random('spawns')
+    item_pos = map.random_position(EMPTY, rng)
+    if item_pos:
+        item = rng.choice(item_list)
+        map.set(*item_pos, item)
+
+def random_delay(chance):
+    """Get a function that draws the ticks until an event with the chance on every tick happens again."""
+    return lambda: ticks_until(chance, get_random('spawns'))
+
+def start_world_events(player):
+    """Schedule the repeating events of the world: items spawning, eggs hatching and seeds growing."""
+    events = player.get_world_events()
+    events.schedule_repeating(random_delay(SPAWN_CHANCE), spawn_items_event, player)
+    events.schedule_repeating(random_delay(HATCH_CHANCE), hatch_egg_event, player)
+    events.schedule_repeating(random_delay(GROW_CHANCE), grow_plant_event, player)
+
+def spawn_items_event(player):
+    """Spawn an egg or coins on a random empty location on the grassland, when there are none yet."""
+    if player.get_current_map_name() == 'grassland':
+        map = player.get_current_map()
+        if not map.contains(EGG) and not map.contains(COINS):
+            spawn_random_item(map, [EGG, COINS, COINS])
+
+def hatch_egg_event(player):
+    """Hatch an egg from the bag, when the player is on the grassland."""
+    if player.get_current_map_name() == 'grassland' and player.get_inventory_item("Eggs") > 0:
+        player.hatch_egg()
+
+def grow_plant_event(player):
+    """Grow a planted seed on the grassland into a berry."""
+    if player.get_current_map_name() == 'grassland':
         grow_plant(player)
 
-    return map
+def spawn_forest(map, position):
+    """Spawn a forest object at the position where the player arrives."""
+    row, col = position
+    map.set(row, col, FOREST)
 
-def random_spawn_tile(map, object, positions=None, check_below=True):
-    """Spawn a tile on a random position from the given list of positions."""
-    forbidden_objects = COLLISION_OBJECTS + INTERACTION_OBJECTS
-    if not positions:
-        positions = find_empty_positions(map)
-
-    spawn_pos = random.choice(positions)
-
-    try:
-        row, col = spawn_pos
-        if is_edge_position(row, col, len(map), len(map[0])):
-            map[row][col] = object
-        elif check_below and map[row + 1][col] in forbidden_objects:
-            random_spawn_tile(map, object, positions, check_below)
-        else:
-            random_spawn_tile(map, object, positions, check_below)
-    except IndexError:
-        random_spawn_tile(map, object, positions, check_below)
-
-def spawn_forest(map, player):
-    """Spawn a forest object at the location of the player."""
-    row, col = player.get_position()
-    map[row][col] = '🌲'
-
-def spawn_beach(map):
+def spawn_beach(map, rng):
     """Spawn one beach object on a random edge position of the map."""
 
-    # Get top and bottom edge positions without corners
-    edge_positions = [(0, c) for c in range(1, len(map[0]) - 1)] + [(len(map) - 1, c) for c in range(1, len(map[0]) - 1)]
-
-    if edge_positions:
-        random_spawn_tile(map, '🏝️', edge_positions, True)
+    # Pick from the top and bottom edge positions without corners
+    if map.cols > 2:
+        map.set(rng.choice((0, map.rows - 1)), rng.randint(1, map.cols - 2), ISLAND)
 
 def plant_seed(player, position=None):
     """Plant a berry seed on the current player position if possible."""
@@ -117,9 +201,9 @@ def plant_seed(player, position=None):
     row, col = position
     current_map = player.get_current_map()
 
-    if current_map[row][col] == '  ':
+    if current_map.get(row, col) == EMPTY:
         player.set_inventory_item("Berry Seeds", -1)
-        current_map[row][col] = '🌱'
+        current_map.set(row, col, SEED)
         print("You planted a seed.")
     else:
         print("You can't plant a seed here.")
@@ -127,28 +211,24 @@ def plant_seed(player, position=None):
 def grow_plant(player):
     """Grows one planted seed into one random berry"""
     current_map = player.get_current_map()
-    planted_seeds = [(r, c) for r in range(len(current_map)) for c in range(len(current_map[r])) if current_map[r][c] == '🌱']
-    if planted_seeds:
-        seed_pos = random.choice(planted_seeds)
-        current_map[seed_pos[0]][seed_pos[1]] = random.choice(GROWABLE_BERRIES)
+    rng = get_random('spawns')
+    seed_pos = current_map.random_position(SEED, rng)
+    if seed_pos:
+        current_map.set(*seed_pos, rng.choice(BERRY_TILES))
 
 def display_map(player):
     """Display the current map and place player."""
-    current_map = player.get_current_map()
-    if player.get_current_map_name() == 'grassland':
-        random_spawn_items(current_map, player)
-    for r in range(len(current_map)):
-        for c in range(len(current_map[r])):
-            if [r, c] == player.get_position():
-                print(player.player_info["skin"], end='')  # Player emoji
-            else:
-                print(current_map[r][c], end=' ')
-        print()
+    draw_map(player.get_current_map(), player.get_position(), player.player_info["skin"])
 
 def create_maps(player):
-    rows, cols = player.get_info()["map_size"]
     maps = {
         'grassland': {'map_type': 'grassland', 'density': 0.4},
     }
+    # The beach of the previous maps doesn't fit the new grassland, it's generated again when the player goes there
+    player.get_maps().clear()
+    player.get_info()["current_map"] = 'grassland'
     for map_name, params in maps.items():
-        player.set_map(map_name, generate_map(rows, cols, params['map_type'], params['density'], player))
\ No newline at end of file
+        player.set_map(map_name, create_map(player, params['map_type'], params['density']))
+
+    if not player.get_maps()['grassland'].in_bounds(*player.get_position()):
+        player.get_info()["position"] = [1, 1] # Coming from a bigger map or the endless world
\ No newline at end of file
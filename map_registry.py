@@ -0,0 +1,188 @@
+import json
+import os
+import tempfile
+from collections import OrderedDict
+
+from config import INACTIVE_MAPS_MAX_TILES, PORTAL_PREFETCH_DISTANCE
+from map import create_map, get_map_save, load_map
+from pokemon import prefetch_worker
+from rng import get_random
+from tile_grid import ISLAND, FOREST
+
+PORTALS = {ISLAND: 'beach', FOREST: 'grassland'} # The map the player travels to from a tile
+
+def get_tiles_in_memory(map):
+    """Get the number of tiles of the map that are in memory."""
+    return len(map.chunks) * map.chunk_size ** 2 if map.endless else len(map.tiles)
+
+def find_portals_nearby(map, position, distance=PORTAL_PREFETCH_DISTANCE):
+    """Find the portal tiles, like 🏝️, within the distance of the position.
+    :return: Dictionary with the tile code and the position of every portal that was found.
+    """
+    row, col = position
+    left = max(col - distance, 0)
+    cols = min(col + distance + 1, map.cols) - left
+    portals = {}
+    for portal_row in range(max(row - distance, 0), min(row + distance + 1, map.rows)):
+        tiles = map.get_row(portal_row, left, cols)
+        for tile in PORTALS:
+            if tile in tiles and tile not in portals:
+                portals[tile] = (portal_row, left + tiles.index(tile))
+    return portals
+
+
+class MapRegistry:
+    """The maps of one player, generated when the player first goes there.
+
+    The maps the player isn't on stay in memory up to max_inactive_tiles tiles, the least recently used ones are written
+    to disk as their seed and changes and generated again when the player comes back. The map behind a portal the player
+    walks up to is prepared in the background, so traveling doesn't wait for it.
+    """
+
+    def __init__(self, player, max_inactive_tiles=INACTIVE_MAPS_MAX_TILES):
+        self.player = player
+        self.max_inactive_tiles = max_inactive_tiles
+        self.maps = OrderedDict() # Maps in memory by name, the least recently used first
+        self.stored = {} # Files of the maps that were written to disk, by name
+        self.prefetched = {} # Maps that are prepared in the background by name, with the seed and the arrival position
+        self.directory = None # Temporary directory for the stored maps, created when the first map is stored
+
+    def __contains__(self, name):
+        return name in self.maps or name in self.stored or name in self.prefetched
+
+    def __iter__(self):
+        return iter(dict.fromkeys([*self.maps, *self.stored, *self.prefetched]))
+
+    def __len__(self):
+        return len(dict.fromkeys([*self.maps, *self.stored, *self.prefetched]))
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def get(self, name):
+        """Get a map, from memory, from the background or from disk.
+        :raise KeyError: When the map was never generated.
+        """
+        if name in self.maps:
+            self.maps.move_to_end(name)
+        elif name in self.prefetched:
+            self.maps[name] = self.take_prefetched(name)
+        elif name in self.stored:
+            self.maps[name] = load_map(self.read(name))
+            del self.stored[name]
+        else:
+            raise KeyError(name)
+
+        map = self.maps[name]
+        self.store_inactive()
+        return map
+
+    def set(self, name, map):
+        """Place a map in the registry, it replaces a map with the same name."""
+        self.discard(name)
+        self.maps[name] = map
+        self.store_inactive()
+
+    def discard(self, name):
+        """Forget a map."""
+        self.maps.pop(name, None)
+        self.stored.pop(name, None)
+        prefetched = self.prefetched.pop(name, None)
+        if prefetched:
+            prefetched[0].cancel()
+
+    def clear(self):
+        """Forget all the maps."""
+        for name in list(self):
+            self.discard(name)
+
+    def get_path(self, name):
+        """Get the file a stored map is written to."""
+        if self.directory is None:
+            self.directory = tempfile.TemporaryDirectory(prefix='pokemon_maps_') # Removed with the registry
+        return os.path.join(self.directory.name, f'{name}.json')
+
+    def write(self, name, map_save):
+        """Write the save of a map to disk."""
+        with open(self.get_path(name), 'w') as file:
+            json.dump(map_save, file)
+        self.stored[name] = self.get_path(name)
+
+    def read(self, name):
+        """Read the save of a map from disk."""
+        with open(self.stored[name], 'r') as file:
+            return json.load(file)
+
+    def store_inactive(self):
+        """Write the least recently used maps the player isn't on to disk, until the others fit in the memory budget."""
+        current = self.player.get_current_map_name()
+        inactive = [name for name in self.maps if name != current]
+        inactive_tiles = sum(get_tiles_in_memory(self.maps[name]) for name in inactive)
+
+        for name in inactive:
+            if inactive_tiles <= self.max_inactive_tiles:
+                break
+            map_save = get_map_save(self.maps[name])
+            if map_save is None:
+                continue # A map that wasn't generated can't be generated again, it stays in memory
+            self.write(name, map_save)
+            inactive_tiles -= get_tiles_in_memory(self.maps.pop(name))
+
+    def get_saves(self):
+        """Get the saves of all the maps, for the player's file.
+        :return: Dictionary with the save of every generated map by name.
+        """
+        saves = {name: self.read(name) for name in self.stored}
+        for name, map in self.maps.items():
+            map_save = get_map_save(map)
+            if map_save:
+                saves[name] = map_save
+        return saves
+
+    def load_saves(self, map_saves):
+        """Replace the maps by the maps of the player's file, they're only generated when the player goes there."""
+        self.clear()
+        for name, map_save in map_saves.items():
+            self.write(name, map_save)
+
+    def prefetch(self, name, position):
+        """Prepare a map in the background, the player arrives at the position when they travel there."""
+        if name in self.maps or name in self.prefetched:
+            return
+
+        from concurrent.futures import Future # Imported when needed, it's slow to import and the start doesn't need it
+
+        future = Future()
+        map_save = self.read(name) if name in self.stored else None
+        # The seed of a new map is drawn here, the random streams aren't used from other threads
+        seed = None if map_save else get_random('map').getrandbits(64)
+        self.prefetched[name] = (future, seed, position)
+
+        def job():
+            if not future.set_running_or_notify_cancel():
+                return # The player went there before the job started
+            try:
+                future.set_result(load_map(map_save) if map_save else create_map(self.player, name, 0.4, position, seed))
+            except Exception as error:
+                future.set_exception(error)
+
+        # The job name is per registry, the same map of another player is another job
+        prefetch_worker.schedule(f'prepare map {name} of {id(self)}', job)
+
+    def take_prefetched(self, name):
+        """Get a map that is prepared in the background, it's generated right away when it isn't done yet."""
+        future, seed, position = self.prefetched.pop(name)
+        if future.cancel() or future.exception():
+            # The same seed and position give the same map as the background would have
+            map = load_map(self.read(name)) if name in self.stored else create_map(self.player, name, 0.4, position, seed)
+        else:
+            map = future.result()
+        self.stored.pop(name, None)
+        return map
+
+    def prefetch_portals(self, map, position):
+        """Prepare the maps behind the portals near the position of the player."""
+        for tile, portal_position in find_portals_nearby(map, position).items():
+            name = PORTALS[tile]
+            if name != self.player.get_current_map_name():
+                self.prefetch(name, list(portal_position))
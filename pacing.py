@@ -0,0 +1,57 @@
+import time
+from contextlib import contextmanager
+
+from config import PACING_MODE
+
+# Share of every delay that is really waited in each pacing mode
+PACING_MODES = {
+    'interactive': 1.0, # The delays as written, so the player can read along
+    'fast': 0.2, # For players that know the game
+    'headless': 0.0, # Automated runs and benchmarks never wait
+}
+
+
+class PacingClock:
+    """Clock for the delays between the messages of the game.
+
+    Every delay is added to the virtual time, also when it isn't waited, so a headless run still knows how long the
+    session would have taken for a player.
+    """
+
+    def __init__(self, mode='interactive', sleep=time.sleep):
+        self.sleep = sleep
+        self.virtual_time = 0.0 # Seconds the game wanted to wait
+        self.waited_time = 0.0 # Seconds that were really waited
+        self.set_mode(mode)
+
+    def set_mode(self, mode):
+        """Change the pacing mode, one of PACING_MODES."""
+        if mode not in PACING_MODES:
+            raise ValueError(f"Unknown pacing mode: {mode}")
+        self.mode = mode
+        self.scale = PACING_MODES[mode]
+
+    def pause(self, seconds):
+        """Wait the given number of seconds, scaled by the pacing mode."""
+        self.virtual_time += seconds
+        delay = seconds * self.scale
+        if delay > 0:
+            self.sleep(delay)
+            self.waited_time += delay
+
+
+pacing_clock = PacingClock(PACING_MODE if PACING_MODE in PACING_MODES else 'interactive')
+
+@contextmanager
+def use_pacing_clock(clock):
+    """Pace the game with another clock inside the with block, for example for one of many games in a process."""
+    global pacing_clock
+    previous, pacing_clock = pacing_clock, clock
+    try:
+        yield clock
+    finally:
+        pacing_clock = previous
+
+def pause(seconds):
+    """Wait between the messages of the game, use this instead of time.sleep so the pacing mode is respected."""
+    pacing_clock.pause(seconds)
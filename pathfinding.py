@@ -0,0 +1,276 @@
+from array import array
+from itertools import islice
+
+from config import WALK_INTERACTION_COST, PATHFINDING_MAX_NODES, WORLD_WALK_RADIUS
+from tile_grid import TILE_FLAGS, COLLISION, INTERACTION, SPAWNABLE
+
+BORDER = 255 # Tile code around a region, it isn't a tile so it can't be walked on
+UNREACHABLE = -1
+VECTORIZED_FIELD_MIN_TILES = 10_000 # Smaller fields are computed tile by tile, quicker than importing NumPy for them
+
+# Cost of stepping on every tile code: 0 can't be walked on, the INTERACTION tiles cost more so walks go around them
+STEP_COSTS = bytes(
+    0 if tile >= len(TILE_FLAGS) or TILE_FLAGS[tile] & COLLISION else
+    WALK_INTERACTION_COST if TILE_FLAGS[tile] & INTERACTION else 1
+    for tile in range(256)
+)
+# Tiles the walks of a distance field go over: not the buildings and portals, but the items that come and go
+FIELD_WALKABLE = bytes(
+    tile < len(TILE_FLAGS) and (STEP_COSTS[tile] == 1 or TILE_FLAGS[tile] & SPAWNABLE != 0)
+    for tile in range(256)
+)
+
+def get_walk_bounds(map, position):
+    """Get the part of the map where walks are found: the whole map, or the tiles around the player in the endless world.
+    :return: Tuple with the top row, the left column, the number of rows and the number of columns.
+    """
+    if not map.endless:
+        return 0, 0, map.rows, map.cols
+
+    row, col = position
+    top, left = max(row - WORLD_WALK_RADIUS, 0), max(col - WORLD_WALK_RADIUS, 0)
+    return top, left, min(row + WORLD_WALK_RADIUS + 1, map.rows) - top, min(col + WORLD_WALK_RADIUS + 1, map.cols) - left
+
+
+class WalkRegion:
+    """Copy of a part of a map as one tile code per byte, with a border of BORDER tiles around it.
+
+    The tiles are numbered row after row including the border, so the neighbours of a tile are its number -1, +1,
+    -width and +width, and the border stops a walk at the edge without checking the bounds.
+    """
+
+    def __init__(self, map, top, left, rows, cols):
+        self.top, self.left, self.rows, self.cols = top, left, rows, cols
+        self.width = cols + 2
+        border_row, border = bytes([BORDER]) * self.width, bytes([BORDER])
+        self.tiles = bytearray().join([border_row] + [border + map.get_row(top + row, left, cols) + border
+                                                      for row in range(rows)] + [border_row])
+        self.costs = self.tiles.translate(STEP_COSTS)
+
+    def contains(self, row, col):
+        """Check if the position of the map is in the region."""
+        return self.top <= row < self.top + self.rows and self.left <= col < self.left + self.cols
+
+    def index(self, row, col):
+        """Get the number of the tile at the position of the map."""
+        return (row - self.top + 1) * self.width + col - self.left + 1
+
+    def get_directions(self, indexes):
+        """Convert a walk along neighbouring tile numbers to the directions of its steps."""
+        directions = {-self.width: 'w', self.width: 's', -1: 'a', 1: 'd'}
+        return [directions[index - previous] for previous, index in zip(indexes, indexes[1:])]
+
+
+def find_path(map, start, goal, max_nodes=PATHFINDING_MAX_NODES):
+    """Find the shortest walk from the start to the goal around the COLLISION tiles with A*. Stepping on an INTERACTION
+    tile on the way costs WALK_INTERACTION_COST steps, so a walk doesn't pick up every item or enter every building.
+    :return: List with the directions of the steps, None when the goal can't be reached from the start.
+    """
+    region = WalkRegion(map, *get_walk_bounds(map, start))
+    if not region.contains(*goal):
+        return None
+
+    costs, width = region.costs, region.width
+    start_index, goal_index = region.index(*start), region.index(*goal)
+    if not costs[goal_index]:
+        return None
+
+    goal_row, goal_col = divmod(goal_index, width)
+    start_row, start_col = divmod(start_index, width)
+    # The tiles to look at are kept in buckets by the cost of the walk to them plus the distance that is left. The
+    # distance never drops by more than a step costs, so the lowest bucket only goes up and no heap is needed. The tile
+    # that was added last is looked at first, that is the one closest to the goal, so on open ground only the tiles
+    # along the way are looked at.
+    estimate = abs(goal_row - start_row) + abs(goal_col - start_col)
+    buckets = {estimate: [start_index]}
+    walked = {start_index: 0}
+    came_from = {start_index: None}
+    nodes = 0
+
+    while buckets:
+        bucket = buckets.get(estimate)
+        if not bucket:
+            buckets.pop(estimate, None)
+            estimate += 1
+            continue
+
+        index = bucket.pop()
+        if index == goal_index:
+            break
+        cost = walked[index]
+        row, col = divmod(index, width)
+        if cost + abs(goal_row - row) + abs(goal_col - col) != estimate:
+            continue # Found again with a cheaper walk after it was added
+        nodes += 1
+        if nodes > max_nodes:
+            return None
+
+        for neighbour in (index - width, index + width, index - 1, index + 1):
+            step_cost = costs[neighbour]
+            if not step_cost:
+                continue
+            neighbour_cost = cost + step_cost
+            if neighbour_cost < walked.get(neighbour, neighbour_cost + 1):
+                walked[neighbour] = neighbour_cost
+                came_from[neighbour] = index
+                row, col = divmod(neighbour, width)
+                neighbour_estimate = neighbour_cost + abs(goal_row - row) + abs(goal_col - col)
+                if neighbour_estimate in buckets:
+                    buckets[neighbour_estimate].append(neighbour)
+                else:
+                    buckets[neighbour_estimate] = [neighbour]
+    else:
+        return None
+
+    indexes = [goal_index]
+    while came_from[indexes[-1]] is not None:
+        indexes.append(came_from[indexes[-1]])
+    return region.get_directions(indexes[::-1])
+
+def compute_distances(costs, width, sources):
+    """Count the steps from every tile to the nearest source tile, with a breadth-first search from all the sources at once.
+    :return: Array with the steps for every tile number, UNREACHABLE for tiles that can't be walked to a source.
+    """
+    if len(costs) < VECTORIZED_FIELD_MIN_TILES:
+        return compute_distances_per_tile(costs, width, sources)
+    try:
+        import numpy as np # Imported for the first big field, importing it slows down the start of the game
+    except ImportError:
+        return compute_distances_per_tile(costs, width, sources)
+
+    walkable = np.frombuffer(costs, dtype=np.uint8) != 0
+    distances = np.full(len(costs), UNREACHABLE, dtype=np.int32)
+    offsets = np.array([-width, width, -1, 1], dtype=np.intp)
+    frontier = np.array(sources, dtype=np.intp)
+    distances[frontier] = 0
+
+    # All the tiles at the same number of steps are found at once, from the neighbours of the tiles one step closer
+    steps = 0
+    while frontier.size:
+        steps += 1
+        neighbours = (frontier[:, None] + offsets).ravel()
+        neighbours = np.unique(neighbours[(distances[neighbours] == UNREACHABLE) & walkable[neighbours]])
+        distances[neighbours] = steps
+        frontier = neighbours
+
+    result = array('i')
+    result.frombytes(distances.tobytes())
+    return result
+
+def compute_distances_per_tile(costs, width, sources):
+    """Count the steps like compute_distances does, tile by tile for small regions or when NumPy isn't installed."""
+    distances = array('i', [UNREACHABLE]) * len(costs)
+    for source in sources:
+        distances[source] = 0
+
+    frontier = list(sources)
+    steps = 0
+    while frontier:
+        steps += 1
+        next_frontier = []
+        append = next_frontier.append
+        for index in frontier:
+            for neighbour in (index - width, index + width, index - 1, index + 1):
+                if distances[neighbour] == UNREACHABLE and costs[neighbour]:
+                    distances[neighbour] = steps
+                    append(neighbour)
+        frontier = next_frontier
+    return distances
+
+
+class DistanceField:
+    """The steps from every tile of a region to the nearest tile with a tile code, like the nearest 🏪.
+
+    Finding the nearest place is looking up the steps at the position of the player, and the walk there follows the
+    tiles with one step less. The walks go around the other buildings and portals, but over the items. The field stays
+    right until a tile stops or starts being walkable, or a tile with the tile code is placed or removed, so the items
+    that spawn and are picked up don't make it compute again.
+    """
+
+    def __init__(self, map, tile, bounds):
+        self.map = map
+        self.tile = tile
+        self.region = WalkRegion(map, *bounds)
+        self.writes_seen = map.writes if map.changes is not None else None
+
+        tiles, sources = self.region.tiles, []
+        index = tiles.find(tile)
+        while index != -1:
+            sources.append(index)
+            index = tiles.find(tile, index + 1)
+        self.distances = compute_distances(tiles.translate(FIELD_WALKABLE), self.region.width, sources)
+
+    def is_valid(self, map, bounds):
+        """Check if the field is still right for the map, by looking at the changes to the map since the last check."""
+        region = self.region
+        if map is not self.map or self.writes_seen is None or bounds != (region.top, region.left, region.rows, region.cols):
+            return False
+
+        # Every write moves its position to the end of the changes, the positions written since the last check are among
+        # the last changes, with the tile it has now.
+        changes = list(islice(reversed(map.changes.items()), map.writes - self.writes_seen))
+        self.writes_seen = map.writes
+        for (row, col), tile in changes:
+            if not region.contains(row, col):
+                continue
+            index = region.index(row, col)
+            previous = region.tiles[index]
+            if previous == tile:
+                continue # Written back to how it was, or written before the last check
+            region.tiles[index] = tile
+            if tile == self.tile or previous == self.tile or FIELD_WALKABLE[tile] != FIELD_WALKABLE[previous]:
+                return False
+        return True
+
+    def get_steps(self, position):
+        """Get the number of steps from the position to the nearest tile, UNREACHABLE when there's no way there."""
+        return self.distances[self.region.index(*position)] if self.region.contains(*position) else UNREACHABLE
+
+    def find_path(self, position):
+        """Find the walk from the position to the nearest tile, it goes around the items when it can.
+        :return: List with the directions of the steps, None when the nearest tile can't be reached.
+        """
+        region, distances = self.region, self.distances
+        if not region.contains(*position):
+            return None
+
+        index = region.index(*position)
+        indexes = [index]
+        if distances[index] == UNREACHABLE:
+            # The player can stand on a building or a portal after leaving it, the walk starts next to it
+            reached = [neighbour for neighbour in (index - region.width, index + region.width, index - 1, index + 1)
+                       if distances[neighbour] != UNREACHABLE]
+            if not reached:
+                return None
+            index = min(reached, key=distances.__getitem__)
+            indexes.append(index)
+
+        while distances[index] > 0:
+            closer = [neighbour for neighbour in (index - region.width, index + region.width, index - 1, index + 1)
+                      if distances[neighbour] == distances[index] - 1]
+            # The last step is onto the tile itself, the other steps rather not onto an item or a building
+            index = min(closer, key=lambda neighbour: distances[neighbour] > 0 and region.costs[neighbour] > 1)
+            indexes.append(index)
+        return region.get_directions(indexes)
+
+
+class DistanceFields:
+    """The distance fields of the map the player is on, by tile code. A field is only computed again when the map
+    changed in a way that makes it wrong, so looking for the nearest place again is a lookup.
+    """
+
+    def __init__(self):
+        self.map = None
+        self.fields = {}
+
+    def get(self, map, tile, position):
+        """Get the field with the steps to the nearest tile with the tile code, for the player at the position."""
+        if map is not self.map:
+            self.map = map
+            self.fields = {} # Only the fields of one map are kept
+
+        bounds = get_walk_bounds(map, position)
+        field = self.fields.get(tile)
+        if field is None or not field.is_valid(map, bounds):
+            field = self.fields[tile] = DistanceField(map, tile, bounds)
+        return field
@@ -1,13 +1,18 @@
 import json
 import os
-import random
-import time
-from time import sleep
 
-from config import COLLISION_OBJECTS, INTERACTION_OBJECTS, TextStyles, ITEM_EMOJIS, GROWABLE_BERRIES, WATER_OBJECTS, GRASS_OBJECTS, POKEBALLS
-from map import plant_seed, generate_map
-from pokemon import type_emoji, fetch_random_pokemon
+from config import TextStyles, ITEM_EMOJIS, GROWABLE_BERRIES, POKEBALLS, POKEMON_LIST_MAX_DELAY, MAP_DEFAULT_SIZE, \
+    MAP_MIN_WIDTH, MAP_MAX_WIDTH, MAP_MIN_HEIGHT, MAP_MAX_HEIGHT, WALK_DESTINATIONS, WORLD_WALK_RADIUS
+from map import plant_seed, create_map, start_world_events, BERRY_TILES
+from map_registry import MapRegistry
+from pacing import pause
+from pathfinding import find_path, DistanceFields
+from pokemon import type_emoji, fetch_random_pokemon, schedule_egg_pool_refill
+from rng import get_random
+from scheduler import EventScheduler
 from shop import show_pokemart_menu, show_pokecenter_menu, show_professor_house_menu
+from tile_grid import COLLISION, INTERACTION, GRASS, WATER, EMPTY, POKEMART, POKECENTER, PROFESSOR_HOUSE, ISLAND, FOREST, \
+    EGG, COINS, TILE_CODES
 
 class Player:
     # Skin options for the player
@@ -17,12 +22,11 @@ class Player:
         "🧍‍♂️": "Boy",
     }
 
-    player_info = {}
-
-    maps = {}
-
     def reset_info(self):
-        """Reset the player's information to default values."""
+        """Reset the player's information to default values, and forget the maps."""
+        self.maps = MapRegistry(self) # Every player has their own maps, so multiple games can be played in one process
+        self.distance_fields = DistanceFields() # Steps to the nearest 🏪, ⛑️... on the current map, for the (g)o to command
+        self.world_events = EventScheduler() # Spawns, hatching and growing, started on the first tick of the world
         self.player_info = {
             "name": "",
             "skin": "🧍",
@@ -30,19 +34,33 @@ class Player:
             "position": [1, 1],
             "coins": 50, # Starter money
             "shiny_rate": 100,
-            "map_size": [7, 20],
+            "map_size": list(MAP_DEFAULT_SIZE),
+            "endless_world": False, # Explore an endless world instead of a map of map_size
             "inventory": {
                 "Poké Balls": 5, # Start the journey with 5 normal Poké Balls
             },
-            "pokemon": []
+            "pokemon": [],
+            "egg_pool": [] # Pokémon that hatch from the next eggs, resolved in advance
         }
 
-    def __init__(self):
+    def __init__(self, ask=input, prefetch=True):
+        self.ask = ask # Asks the player a question and returns the answer, input() unless the game is played headless
+        self.prefetch = prefetch # Resolve the Pokémon in the eggs in the background
         self.reset_info() # Initialize the player's information with default values
 
 
+    def get_world_events(self):
+        """Get the scheduler with the events of the world."""
+        return self.world_events
+
+    def advance_world(self, ticks=1):
+        """Advance the world by the ticks, the items spawn, the eggs hatch and the seeds grow when their events are due."""
+        if not self.world_events:
+            start_world_events(self) # The events repeat, so the queue is only empty before the start
+        self.world_events.advance(ticks)
+
     def get_maps(self):
-        """Get the full dictionary of maps."""
+        """Get the registry with the maps."""
         return self.maps
 
     def get_current_map(self):
@@ -61,18 +79,20 @@ class Player:
     def set_map(self, name, map):
         """Place a map in the dictionary of maps."""
         try:
-            self.maps[name] = map
+            self.maps.set(name, map)
         except KeyError:
             print("An error occurred while trying to set the map.")
 
     def switch_map(self, map_name):
         """Switch the player to a different map."""
+        self.player_info["current_map"] = map_name
         if map_name not in self.maps:
             # generate the map if it doesn't exist
-            self.set_map(map_name, generate_map(7, 20, map_name, 0.4, self))
-            self.player_info["current_map"] = map_name
-            return
-        self.player_info["current_map"] = map_name
+            self.set_map(map_name, create_map(self, map_name))
+
+    def get_egg_pool(self):
+        """Get the list of Pokémon that hatch from the next eggs."""
+        return self.player_info.setdefault("egg_pool", []) # Saves from before the egg pool don't have one
 
     def add_pokemon_to_bag(self, pokemon):
         """Add a Pokémon list to the player's information."""
@@ -82,7 +102,7 @@ class Player:
         print("Choose a skin for your player:")
         for number, (skin, name) in enumerate(self.skins.items()):
             print(f"{number + 1}. {skin} - {name}")
-        choice = input("Enter the number of the skin you want: ")
+        choice = self.ask("Enter the number of the skin you want: ")
         try:
             choice = int(choice)
             if choice < 1 or choice > len(self.skins):
@@ -101,28 +121,43 @@ class Player:
         """Set the player's information."""
         self.player_info.update(info)
 
-    def set_map_width(self, width=None):
-        """Set the width of the map."""
+    def ask_map_dimension(self, name, value, minimum, maximum, default):
+        """Ask for the width or height of the map until it's between the minimum and maximum.
+        :return: The valid width or height.
+        """
         while True:
-            if width is None:
-                user_input = input("Enter the width for the map: ")
+            if value is None:
+                user_input = self.ask(f"Enter the {name} for the map: ")
                 try:
-                    width = int(user_input)
+                    value = int(user_input)
                 except ValueError:
-                    print("Please enter a valid number for the width. Default is 20.")
+                    print(f"Please enter a valid number for the {name}. Default is {default}.")
                     continue
 
-            if width < 10:
-                print("The width can't be less than 10.")
-                width = None  # Reset width and prompt for input again
-            elif width > 50:
-                print("The width can't be more than 75.")
-                width = None
+            if value < minimum:
+                print(f"The {name} can't be less than {minimum}.")
+                value = None  # Reset the value and prompt for input again
+            elif value > maximum:
+                print(f"The {name} can't be more than {maximum}.")
+                value = None
             else:
-                break
+                return value
+
+    def set_map_size(self):
+        """Choose between an endless world and a map with a width and height."""
+        self.player_info["endless_world"] = self.yes_no_question("Do you want to explore an endless world?")
+        if not self.player_info["endless_world"]:
+            self.set_map_width()
+            self.set_map_height()
 
+    def set_map_width(self, width=None):
+        """Set the width of the map."""
         # Update the map size in the player's data
-        self.player_info["map_size"][1] = width
+        self.player_info["map_size"][1] = self.ask_map_dimension('width', width, MAP_MIN_WIDTH, MAP_MAX_WIDTH, MAP_DEFAULT_SIZE[1])
+
+    def set_map_height(self, height=None):
+        """Set the height of the map."""
+        self.player_info["map_size"][0] = self.ask_map_dimension('height', height, MAP_MIN_HEIGHT, MAP_MAX_HEIGHT, MAP_DEFAULT_SIZE[0])
 
     def get_inventory_item(self, item):
         """Get the quantity of an item from the player's inventory."""
@@ -204,7 +239,7 @@ class Player:
 
     def ask_name(self):
         """Ask the player for their name and validate the input."""
-        name = input("What is your name?: ").strip().capitalize()
+        name = self.ask("What is your name?: ").strip().capitalize()
         if len(name) < 1:
             print("The name you entered is too short")
             return self.ask_name()
@@ -216,7 +251,7 @@ class Player:
             return self.ask_name()
 
         print(f"Your name is, {name}!")
-        time.sleep(0.6)
+        pause(0.6)
         return name
 
     def get_position(self):
@@ -243,8 +278,11 @@ class Player:
             if not os.path.exists("saves"):
                 os.makedirs("saves")
 
+            # The maps are saved as their seed and the tiles that changed, they are generated again when loading
+            data = dict(self.player_info, maps=self.maps.get_saves())
+
             with open(f"saves/player_{self.player_info['name'].lower()}.json", "w") as file:
-                json.dump(self.player_info, file, indent=4)
+                json.dump(data, file, indent=4)
                 print("\nSaved the player's data")
         except FileNotFoundError:
             print("An error occurred while saving the player's information.")
@@ -256,8 +294,12 @@ class Player:
         try:
             # Load the player's information from a JSON file
             with open(f"saves/player_{player_name.lower()}.json", "r") as file:
+                data = json.load(file)
+                # Saves from before the maps were saved don't have them, their maps are generated by create_maps
+                self.maps.load_saves(data.pop("maps", {}))
                 # overwrite the player's information with the loaded data but keep new keys when adding new features
-                self.player_info.update(json.load(file))
+                self.player_info.update(data)
+                schedule_egg_pool_refill(self)
                 return True
         except FileNotFoundError:
             return False
@@ -279,7 +321,7 @@ class Player:
             file = file.split("_")[1].split(".")[0].capitalize() # Remove the 'player_' and '.json' from name for display
             print(f"{number}. {file}")
 
-        choice = input("Enter the number of the save you want to load: ")
+        choice = self.ask("Enter the number of the save you want to load: ")
         try:
             choice = int(choice)
             player_name = files[choice - 1].split("_")[1].split(".")[0]
@@ -312,25 +354,17 @@ class Player:
         elif direction == 'd':
             new_j = j + 1
         else:
-            if ',' in direction:
-                try:
-                    print("Teleporting to coordinates...")
-                    split_coords = direction.split(',')
-                    new_i, new_j = int(split_coords[0]), int(split_coords[1])
-                    print(f"Teleported to {new_i}, {new_j}")
-                except ValueError:
-                    print("Invalid coordinates! Please enter the coordinates as 'i,j'.")
-                    return False
-            else:
-                print("Invalid direction! Use w/a/s/d to move, or 'q' to quit.")
-                return False
+            print("Invalid direction! Use w/a/s/d to move, or 'q' to quit.")
+            return False
 
-        if 0 <= new_i < len(map) and 0 <= new_j < len(map[0]):
+        if map.in_bounds(new_i, new_j):
             if self.is_collision(map, [new_i, new_j]):
-                print(f"Can't move there, it's a {map[new_i][new_j]}!") # Show the object Emoji the player collided with
+                print(f"Can't move there, it's a {map.emoji(new_i, new_j)}!") # Show the object Emoji the player collided with
                 return False
             else:
                 self.player_info["position"] = [new_i, new_j]
+                if self.prefetch:
+                    self.maps.prefetch_portals(map, [new_i, new_j]) # Prepare the beach before the player steps on the 🏝️
 
                 if self.is_interaction(map, [new_i, new_j]):
                     self.interact(map, [new_i, new_j])
@@ -341,6 +375,55 @@ class Player:
 
         return True
 
+    def find_path_to(self, coordinates):
+        """Find the walk to the coordinates 'i,j' around the trees and the water.
+        :return: List with the directions of the steps, None when the player can't walk there.
+        """
+        try:
+            split_coords = coordinates.split(',')
+            row, col = int(split_coords[0]), int(split_coords[1])
+        except (ValueError, IndexError):
+            print("Invalid coordinates! Please enter the coordinates as 'i,j'.")
+            return None
+
+        map = self.get_current_map()
+        i, j = self.player_info["position"]
+        if not map.in_bounds(row, col):
+            print("Can't walk outside the map boundaries!")
+            return None
+        if map.endless and max(abs(row - i), abs(col - j)) > WORLD_WALK_RADIUS:
+            print(f"That's too far away, you can walk up to {WORLD_WALK_RADIUS} tiles in every direction.")
+            return None
+        if self.is_collision(map, [row, col]):
+            print(f"Can't walk there, it's a {map.emoji(row, col)}!")
+            return None
+
+        path = find_path(map, [i, j], [row, col])
+        if path is None:
+            print(f"There's no way to walk to {row}, {col}.")
+        return path
+
+    def find_path_to_nearest(self, emoji):
+        """Find the walk to the nearest tile with the emoji, like the nearest 🏪.
+        :return: List with the directions of the steps, None when there's no such tile the player can walk to.
+        """
+        map = self.get_current_map()
+        position = self.player_info["position"]
+        path = self.distance_fields.get(map, TILE_CODES[emoji], position).find_path(position)
+        if path is None:
+            print(f"There's no {emoji} you can walk to{' nearby' if map.endless else ''}.")
+        elif not path:
+            print(f"You're already at the {emoji}!")
+        return path
+
+    def ask_walk_destination(self):
+        """Ask the player to which of the WALK_DESTINATIONS they want to walk.
+        :return: The emoji of the destination.
+        """
+        options = [f"{emoji} {name}" for name, emoji in WALK_DESTINATIONS.items()]
+        choice = self.multiple_choice_question("Where do you want to go? To the nearest:", options)
+        return list(WALK_DESTINATIONS.values())[options.index(choice)]
+
     def multiple_choice_question(self, question, options, show_numbers=True):
         """Ask a multiple choice question and return the string of the selected option."""
 
@@ -354,7 +437,7 @@ class Player:
             for number, option in enumerate(options, 1):
                 print(f"{number}. {option}")
 
-            choice = input("Choose an option (number): ").strip()
+            choice = self.ask("Choose an option (number): ").strip()
 
             # Validate numeric choice
             if choice.isdigit() and 1 <= int(choice) <= len(options):
@@ -368,7 +451,7 @@ class Player:
             for option in options:
                 print(f"({option[0].lower()}) {option}")
 
-            choice = input("Choose an option (letter): ").strip().lower()
+            choice = self.ask("Choose an option (letter): ").strip().lower()
 
             # Validate letter choice
             if choice and any(choice == option[0].lower() for option in options):
@@ -379,7 +462,7 @@ class Player:
 
     def yes_no_question(self, question):
         """Ask a yes/no question and return the answer. If the answer is wrong, ask again."""
-        answer = input(f"{question} (y/n): ").strip().lower()
+        answer = self.ask(f"{question} (y/n): ").strip().lower()
 
         try:
             if answer[0] == 'y':
@@ -397,60 +480,62 @@ class Player:
     def interact(self, map, position):
         """Interact with the object on the map."""
         i, j = position
-        if map[i][j] == '🏪':
+        tile = map.get(i, j)
+        if tile == POKEMART:
             print("You entered the Poké Mart! \n")
-            time.sleep(1)
+            pause(1)
             show_pokemart_menu(self)
-        elif map[i][j] == '⛑️':
+        elif tile == POKECENTER:
             print("You entered the Pokémon Center!")
-            time.sleep(1)
+            pause(1)
             show_pokecenter_menu(self)
-        elif map[i][j] == '🏠':
+        elif tile == PROFESSOR_HOUSE:
             show_professor_house_menu()
-        elif map[i][j] in GROWABLE_BERRIES:
+        elif tile in BERRY_TILES:
             try:
-                berry = [key for key, value in ITEM_EMOJIS.items() if value == map[i][j]][0]
+                berry = [key for key, value in ITEM_EMOJIS.items() if value == map.emoji(i, j)][0]
                 print(f"You found {berry}!")
                 # ask if player wants to pick it up
                 if self.yes_no_question("Do you want to pick this berry up?"):
                     self.set_inventory_item(berry, 1, "add")
-                    map[i][j] = '  '
+                    map.set(i, j, EMPTY)
                 else:
                     print("The berry disappeared...")
-                    map[i][j] = '  '
+                    map.set(i, j, EMPTY)
             except IndexError:
                 print("There was an error while trying to pick up the berry.")
-        elif map[i][j] == '🥚':
+        elif tile == EGG:
             print("You found an egg!")
             # ask if player wants to pick it up
             if self.yes_no_question("Do you want to pick it up?"):
                 self.set_inventory_item("Eggs", 1)
-                map[i][j] = '  '
+                schedule_egg_pool_refill(self) # Resolve the Pokémon in the egg while the player walks around
+                map.set(i, j, EMPTY)
             else:
                 print("The egg disappeared...")
-                map[i][j] = '  '
-        elif map[i][j] == '💰':
-            coins = random.randint(25, 250)
+                map.set(i, j, EMPTY)
+        elif tile == COINS:
+            coins = get_random('spawns').randint(25, 250)
             print(f"You found a bag with {coins} coins!")
             # ask if player wants to pick it up
             if self.yes_no_question("Do you want to pick it up?"):
                 self.set_coins(coins, "add")
-                map[i][j] = '  '
+                map.set(i, j, EMPTY)
             else:
                 print("The bag of coins disappeared...")
-                map[i][j] = '  '
-        elif map[i][j] == '🏝️':
+                map.set(i, j, EMPTY)
+        elif tile == ISLAND:
             # ask if player wants to travel to the beach
             if self.yes_no_question("Do you want to travel to the beach?"):
                 self.switch_map("beach")
-        elif map[i][j] == '🌲':
+        elif tile == FOREST:
             if self.yes_no_question("Do you want to travel to the grassland?"):
                 self.switch_map("grassland")
 
     def is_interaction(self, map, position):
         """Check if the coordinates are an interaction object on the map."""
         i, j = position
-        return map[i][j] in INTERACTION_OBJECTS
+        return map.has_flag(i, j, INTERACTION)
 
     def interact_if_possible(self, position):
         """Interact with the object on the map if it's possible."""
@@ -462,21 +547,21 @@ class Player:
     def is_collision(self, map, position):
         """Check if the coordinates are a collision object on the map."""
         i, j = position
-        return map[i][j] in COLLISION_OBJECTS
+        return map.has_flag(i, j, COLLISION)
 
     def is_grass(self, position=None):
         """Check if the coordinates are grass on the map. Can be used for wild encounters."""
         if position is None:
             position = self.player_info["position"]
         i, j = position
-        return self.get_current_map()[i][j] in GRASS_OBJECTS
+        return self.get_current_map().has_flag(i, j, GRASS)
 
     def is_water(self, position=None):
         """Check if the coordinates are water on the map. Can be used for wild encounters."""
         if position is None:
             position = self.player_info["position"]
         i, j = position
-        return self.get_current_map()[i][j] in WATER_OBJECTS
+        return self.get_current_map().has_flag(i, j, WATER)
 
     def get_emoji_for_item(self, item):
         """Get the emoji for an item from the ITEM_EMOJIS dictionary."""
@@ -513,7 +598,7 @@ class Player:
         # check if player has seeds
         has_seeds = self.get_inventory_item("Berry Seeds") > 0
 
-        choice = input(f"\nPress Enter to go back or S to save {'or P to plant your seeds' if has_seeds else ''} -> ").strip().lower()
+        choice = self.ask(f"\nPress Enter to go back or S to save {'or P to plant your seeds' if has_seeds else ''} -> ").strip().lower()
         if len(choice) > 0:
             if len(choice) > 0 and choice[0] == 's':
                 self.save()
@@ -540,7 +625,7 @@ class Player:
             print(f"{number}. {item} {item_emoji}: {quantity}")
 
         print(f"{number + 1}. Exit")
-        choice = input("Choose an item from your bag: ")
+        choice = self.ask("Choose an item from your bag: ")
 
         try:
             if choice == "e" or choice == "exit":
@@ -573,7 +658,7 @@ class Player:
             # Ask the player to give a nickname again or keep the default name
             choice = self.yes_no_question("Do you still want to give a nickname?")
             if choice:
-                return self.pokemon_set_nickname(index, input("Enter a nickname: ").strip().capitalize())
+                return self.pokemon_set_nickname(index, self.ask("Enter a nickname: ").strip().capitalize())
             else:
                 return False
 
@@ -581,7 +666,7 @@ class Player:
             return False
         else:
             if type(nickname) != str:
-                return self.pokemon_set_nickname(index, input("Enter a nickname: ").strip().capitalize())
+                return self.pokemon_set_nickname(index, self.ask("Enter a nickname: ").strip().capitalize())
 
             self.player_info['pokemon'][index]['nickname'] = nickname
             return True
@@ -612,13 +697,15 @@ class Player:
 
         print(f"\n{TextStyles.bold}Pokémon List{TextStyles.reset}")
         print(f"Total Pokémon: {len(self.player_info['pokemon'])}")
+        # Scroll the rows by, but a big collection never takes longer than POKEMON_LIST_MAX_DELAY
+        row_delay = min(0.01, POKEMON_LIST_MAX_DELAY / max(len(self.player_info['pokemon']), 1))
         for number, pokemon in enumerate(self.player_info["pokemon"], 1): # Start the numbering from 1
-            time.sleep(0.01)
+            pause(row_delay)
             is_shiny = "✨" if self.is_pokemon_shiny(pokemon) else ""
 
             # if the pokemon has a nickname the player gave show it, otherwise show only the name
             print(f"{number}. {is_shiny}{TextStyles.green + self.pokemon_nickname(pokemon) + TextStyles.reset + ' - ' if self.pokemon_has_nickname(pokemon) else ''}{ TextStyles.grey + pokemon['name'] + TextStyles.reset} - ID: {pokemon['id']}")
-        number = input("\nPress Enter to go back, select a Pokémon to view or type 'release all' to release all double Pokémon: ").strip()
+        number = self.ask("\nPress Enter to go back, select a Pokémon to view or type 'release all' to release all double Pokémon: ").strip()
         try:
             if number == "":
                 return
@@ -645,7 +732,7 @@ class Player:
         """Release a Pokémon from the player's list."""
         print(f"You released {self.pokemon_nickname(self.player_info['pokemon'][index])} back into the wild!")
         self.player_info["pokemon"].pop(index)
-        sleep(1)
+        pause(1)
 
     def release_duplicate_pokemon(self):
         """Release all duplicate Pokémon from the player's list.
@@ -673,13 +760,13 @@ class Player:
 
         print(f"\nYou have {TextStyles.yellow}{len([p for p in self.player_info['pokemon'] if p['id'] == pokemon['id']])}{TextStyles.reset} of this Pokémon.")
 
-        choice = input("\nPress Enter to go back or R to release this Pokémon, N to give a nickname: ").strip()
+        choice = self.ask("\nPress Enter to go back or R to release this Pokémon, N to give a nickname: ").strip()
         try:
             if len(choice) > 0:
                 if choice[0].lower() == 'r':
                     self.release_pokemon(index)
                 elif choice[0].lower() == 'n':
-                    self.pokemon_set_nickname(index, input("Enter a nickname: "))
+                    self.pokemon_set_nickname(index, self.ask("Enter a nickname: "))
 
         except ValueError:
             return self.view_pokemon(index)
@@ -692,7 +779,7 @@ class Player:
             return
 
         print("Oh? An egg is hatching...\n")
-        time.sleep(2)
+        pause(2)
 
         hatched_pokemon = fetch_random_pokemon(self)
 
@@ -702,7 +789,7 @@ class Player:
             print(f"Congratulations! You hatched a {hatched_pokemon['name']}!")
 
             if self.yes_no_question("Do you want to give this Pokémon a nickname?"):
-                hatched_pokemon['nickname'] = input("Enter a nickname: ").strip().capitalize()
+                hatched_pokemon['nickname'] = self.ask("Enter a nickname: ").strip().capitalize()
 
             print(f"Added {hatched_pokemon['name'] if 'nickname' not in hatched_pokemon else hatched_pokemon['nickname']} to your bag.")
         else:
@@ -712,38 +799,40 @@ class Player:
         """Help menu with the explanation about the game."""
         print(f"\n{TextStyles.bold}Welcome to the world of Pokémon Catch!{TextStyles.reset}\n")
         print(f"You are a Pokémon Hobbyist ({self.player_info['skin']} on the map), you want to catch the Pokémon you like. Without fighting them.")
-        time.sleep(2)
+        pause(2)
         print("In this game, you can move around the map, catch Pokémon and collect items and coins along the way.")
-        time.sleep(2)
+        pause(2)
         print("You can move using W/A/S/D. Press B to open your bag, and Q to quit the game.")
-        time.sleep(1)
+        pause(1)
+        print("Type coordinates like 3,12 to walk there, or press G to walk to the nearest PokéMart, Pokémon Center or beach.")
+        pause(1)
         print("You can encounter wild Pokémon in the grass (🌿) and catch them using various Poké Balls in your bag.")
-        time.sleep(2)
+        pause(2)
         print("\nVisit the PokéMart (🏪) to buy items such as Poké Balls you need to catch the pokemon. to help you on your journey.")
-        time.sleep(2)
+        pause(2)
         print("On your way you can find coins (💰) which you can use to buy items from the PokéMart.")
         print("Or you can sell items you don't need to the PokéMart in exchange for some coins.\n")
-        time.sleep(2)
+        pause(2)
         print("Visit the Pokémon Center (⛑️) to view the list of Pokémon you've caught, release them, or give them nicknames.")
         if self.get_inventory_item("Eggs") > 0:
-            time.sleep(1.5)
+            pause(1.5)
             print("\nThe Egg (🥚) in your bag, can hatch at any random moment during your journey. It hatches into a random Pokémon out of all 151 Kanto Pokémon. Including the legendary ones.")
         if self.get_inventory_item("Berry Seeds") > 0:
-            time.sleep(1.5)
+            pause(1.5)
             berries = ', '.join([berry for berry in GROWABLE_BERRIES])
             print(f"\nYou can plant Berry Seeds (🌱) on the grassland map. They grow into Berries {berries} over time that you can pick up.")
         if self.get_inventory_item("Razz Berries") > 0 or self.get_inventory_item("Golden Razz Berries") > 0:
-            time.sleep(1.5)
+            pause(1.5)
             print("\nRazz Berries (🍇) increase the catch rate of the Pokémon you encounter.")
             print("Golden Razz Berries (🍋) are even stronger and increase the catch rate more.")
         if self.get_inventory_item("Pinap Berries") > 0:
-            time.sleep(1.5)
+            pause(1.5)
             print("Pinap Berries (🍍) increase the shiny chance of the Pokémon for the next encounter.\n")
 
-        time.sleep(3)
+        pause(3)
 
         # print("The emojis you see beside the Pokémon's name represent their type. 🌱(grass)🔥(fire)💧(water) etc.")
-        # time.sleep(3)
+        # pause(3)
         # print("Visit the Professor's house (🏠) to get information about the Pokémon you've caught.")
 
 def initialize_new_player(player):
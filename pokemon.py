@@ -1,11 +1,20 @@
-import random
+import json
+import threading
 import time
-from time import sleep
-
-import requests
+from collections import OrderedDict
 
+from api_cache import ResponseCache
 from config import POKEAPI_BASE_URL, WILD_POKEMON_PRELOAD_COUNT, LEGENDARY_POKEMON, wild_grass_pokemon_file, \
-    wild_water_pokemon_file, POKEBALLS
+    wild_water_pokemon_file, legacy_wild_grass_pokemon_file, legacy_wild_water_pokemon_file, POKEBALLS, API_CACHE_FILE, API_CACHE_TTL, API_CACHE_MAX_BYTES, API_OFFLINE_MODE, \
+    PRELOAD_MAX_ATTEMPTS_PER_POKEMON, API_CONNECT_TIMEOUT, API_READ_TIMEOUT, API_POOL_SIZE, API_MAX_RETRIES, \
+    API_RETRY_BACKOFF, API_CIRCUIT_BREAKER_THRESHOLD, API_CIRCUIT_BREAKER_COOLDOWN, PRELOAD_MAX_IN_FLIGHT, encounter_index_file, \
+    ENCOUNTER_INDEX_VERSION, ENCOUNTER_INDEX_RETRY_DELAY, WILD_POKEMON_LOW_WATERMARK, SPECIES_CACHE_SIZE, EGG_POOL_SIZE, \
+    POKEBALL_CATCH_BONUS, BREAK_FREE_CHANCE, MAX_CATCH_RATE, BERRY_CATCH_BONUS, SHINY_CHANCE_THRESHOLD
+from pacing import pause
+from rng import get_random
+from species_data import get_species, load_species_table
+from wild_pokemon_store import write_wild_pokemon_file, append_wild_pokemon_file, read_wild_pokemon_file, \
+    migrate_legacy_wild_pokemon_file
 
 # Emoji dictionary for Pokémon types
 type_emoji = {
@@ -29,131 +38,515 @@ type_emoji = {
     'psychic': '🔮',
 }
 
-def fetch_from_api(endpoint):
-    """Make a GET request to the specified API endpoint and return the JSON data.
+class CircuitBreaker:
+    """Stop calling the API for a while after too many failed requests in a row, so the game can keep running without it."""
+
+    def __init__(self, threshold=API_CIRCUIT_BREAKER_THRESHOLD, cooldown=API_CIRCUIT_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False # A trial request after the cooldown is on its way
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        """Check if the API is considered unreachable. After the cooldown one trial request is let through again, for
+        the other callers the circuit stays open until the trial succeeded or failed.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return False
+            if self.trial_running or time.monotonic() - self.opened_at < self.cooldown:
+                return True
+            self.trial_running = True # The caller that gets False makes the trial request
+            return False
+
+    def is_cooling_down(self):
+        """Check if the circuit is open and no trial request would be let through, without starting the trial."""
+        with self._lock:
+            return self.opened_at is not None and \
+                (self.trial_running or time.monotonic() - self.opened_at < self.cooldown)
+
+    def record_success(self):
+        """Close the circuit again after a successful request."""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        """Count a failed request and open the circuit when there were too many in a row.
+        :return: True when the circuit just opened, False otherwise.
+        """
+        with self._lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.failures < self.threshold:
+                return False
+
+            just_opened = self.opened_at is None
+            self.opened_at = time.monotonic()
+            return just_opened
+
+
+class ApiClient:
+    """Shared HTTP client for all the PokeAPI traffic with keep-alive connections, retries and a circuit breaker."""
+
+    RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+    def __init__(self, timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT), pool_size=API_POOL_SIZE,
+                 max_retries=API_MAX_RETRIES, backoff=API_RETRY_BACKOFF, circuit_breaker=None):
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self._session = None
+        self._lock = threading.Lock()
+
+    def get_session(self):
+        """Create the shared session on first use, its connections are kept alive between the requests."""
+        with self._lock:
+            if self._session is None:
+                # Import the HTTP stack only when the first request is made, it's slow to import and often not needed
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session = session
+            return self._session
+
+    def is_available(self):
+        """Check if the API can be called, False while the circuit breaker is open."""
+        return not self.circuit_breaker.is_cooling_down()
+
+    def retry_delay(self, attempt):
+        """Exponential backoff with a random jitter, so retries from multiple threads don't arrive all at once."""
+        return self.backoff * (2 ** attempt) * get_random('network').uniform(0.5, 1.5)
+
+    def get_json(self, url, verbose=True):
+        """Make a GET request and retry it when a transient error occurs.
+        :return: JSON data from the API, None when the API can't be reached or doesn't know the url.
+        """
+        if self.circuit_breaker.is_open(): # Also lets this request through as the trial after the cooldown
+            return None
+
+        session = self.get_session()
+        from requests import RequestException # Already imported by get_session
+
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                time.sleep(self.retry_delay(attempt - 1))
+
+            try:
+                response = session.get(url, timeout=self.timeout)
+            except RequestException:
+                continue # Connection errors and timeouts are worth another try
+
+            if response.status_code in self.RETRYABLE_STATUS_CODES:
+                continue
+
+            # The API is reachable, other errors like 404 won't go away by retrying
+            self.circuit_breaker.record_success()
+            if not response.ok:
+                return None
+            try:
+                return response.json()
+            except ValueError:
+                return None
+
+        if self.circuit_breaker.record_failure() and verbose:
+            print("\nCan't reach the PokeAPI right now. The game continues with the Pokémon data it already has.")
+        return None
+
+
+api_client = ApiClient()
+api_cache = ResponseCache(API_CACHE_FILE, API_CACHE_TTL, API_CACHE_MAX_BYTES)
+
+def fetch_from_api(endpoint, verbose=True):
+    """Get the JSON data of the specified API endpoint from the cache or make a GET request when it's not cached.
     :return: JSON data from the API, None when an error occurs.
     """
-    try:
-        response = requests.get(endpoint)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        return response.json()
-    except Exception:
-        print("Error fetching data from the API. Is your internet connection working?")
-        exit("Exiting the game.")
+    data = api_cache.get(endpoint)
+    if data is not None:
+        return data
 
-    return None
+    if API_OFFLINE_MODE: # Never touch the network in offline mode, expired data is better than no data
+        return api_cache.get(endpoint, allow_stale=True)
 
-# Check if a Pokémon can be found in the wild in a grass area
-def can_be_found_in_grass(pokemon_id):
-    """Check if a given Pokémon can be found in the wild in a grass area.
-    :return: True if the Pokémon can be found in the grass, False otherwise.
+    data = api_client.get_json(endpoint, verbose)
+    if data is None:
+        # Fall back to the expired data when the API can't be reached
+        return api_cache.get(endpoint, allow_stale=True)
+
+    api_cache.put(endpoint, data)
+    return data
+
+# Encounter methods from the PokeAPI that count as finding a Pokémon in the grass or in the water
+GRASS_ENCOUNTER_METHODS = ['walk', 'old-walk', 'shake-tree', '.walk', 'sos-encounter', 'roaming-grass']
+WATER_ENCOUNTER_METHODS = ['surf', 'rod', 'super-rod', 'fish-chain']
+
+def fetch_encounter_areas(pokemon_id, verbose=True):
+    """Walk the encounters of a Pokémon from the API to find the areas where it can be found in the wild.
+    :return: Set with 'grass' and/or 'water', None when the encounters couldn't be loaded.
+    """
+    data = fetch_from_api(f'{POKEAPI_BASE_URL}pokemon/{pokemon_id}/encounters', verbose)
+    if data is None:
+        return None
+
+    areas = set()
+    for location in data:
+        for version_detail in location['version_details']:
+            for encounter_detail in version_detail['encounter_details']:
+                if encounter_detail['method']['name'] in GRASS_ENCOUNTER_METHODS:
+                    areas.add('grass')
+                elif encounter_detail['method']['name'] in WATER_ENCOUNTER_METHODS:
+                    areas.add('water')
+    return areas
+
+def build_encounter_index(max_in_flight=PRELOAD_MAX_IN_FLIGHT, verbose=True):
+    """Check once for every first-generation Pokémon if it can be found in the grass or in the water.
+    :return: Dictionary with the sorted 'grass' and 'water' Pokémon ids, None when not all Pokémon could be checked.
+    """
+    # Don't allow legendary Pokémon to be found in the wild, only be found in Eggs
+    pokemon_ids = [pokemon_id for pokemon_id in range(1, 152) if pokemon_id not in LEGENDARY_POKEMON]
+
+    from concurrent.futures import ThreadPoolExecutor # Imported when needed, it's slow to import and rarely needed
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        all_areas = list(executor.map(fetch_encounter_areas, pokemon_ids, [verbose] * len(pokemon_ids)))
+
+    if None in all_areas: # Don't save an incomplete index, try again next time
+        return None
+
+    return {
+        'version': ENCOUNTER_INDEX_VERSION,
+        'grass': [pokemon_id for pokemon_id, areas in zip(pokemon_ids, all_areas) if 'grass' in areas],
+        'water': [pokemon_id for pokemon_id, areas in zip(pokemon_ids, all_areas) if 'water' in areas],
+    }
+
+def load_encounter_index(filename=encounter_index_file, verbose=True):
+    """Load the encounter index from the file, or build and save it when the file is missing or outdated.
+    :return: Dictionary with the 'grass' and 'water' Pokémon ids, None when the index isn't available.
+    """
+    try:
+        with open(filename, 'r') as f:
+            index = json.load(f)
+        if index.get('version') == ENCOUNTER_INDEX_VERSION:
+            return index
+    except (FileNotFoundError, ValueError):
+        pass
+
+    if verbose:
+        print("Indexing where the wild Pokémon can be found...")
+    index = build_encounter_index(verbose=verbose)
+    if index:
+        with open(filename, 'w') as f:
+            json.dump(index, f)
+    return index
+
+encounter_index = None
+encounter_index_building = False
+encounter_index_retry_time = 0.0 # time.monotonic() after which a failed build is tried again
+encounter_index_lock = threading.Lock()
+
+def get_encounter_index(verbose=True):
+    """Get the encounter index, it's loaded or built once per session. A failed build is tried again after
+    ENCOUNTER_INDEX_RETRY_DELAY seconds, and while another thread builds it the index isn't available yet, so the
+    callers use their fallback instead of waiting for the requests of the build.
+    :return: Dictionary with the 'grass' and 'water' Pokémon ids, None when the index isn't available.
+    """
+    global encounter_index, encounter_index_building, encounter_index_retry_time
+    with encounter_index_lock:
+        if encounter_index is not None or encounter_index_building or time.monotonic() < encounter_index_retry_time:
+            return encounter_index
+        encounter_index_building = True
+
+    index = None
+    try:
+        index = load_encounter_index(verbose=verbose) # Outside the lock, building it takes a request per Pokémon
+    finally:
+        with encounter_index_lock:
+            encounter_index = index
+            encounter_index_building = False
+            if index is None:
+                encounter_index_retry_time = time.monotonic() + ENCOUNTER_INDEX_RETRY_DELAY
+    return index
+
+def can_be_found_in_area(pokemon_id, area, verbose=True):
+    """Check if a given Pokémon can be found in the wild in the given area (grass or water).
+    :return: True if the Pokémon can be found in the area, False otherwise.
     """
     if pokemon_id in LEGENDARY_POKEMON: # Don't allow legendary Pokémon to be found in the wild, only be found in Eggs
         return False
 
-    data = fetch_from_api(f'{POKEAPI_BASE_URL}pokemon/{pokemon_id}/encounters')
+    index = get_encounter_index(verbose)
+    if index:
+        return pokemon_id in index[area]
 
-    if data:
-        for location in data:
-            for version_detail in location['version_details']:
-                for encounter_detail in version_detail['encounter_details']:
-                    if encounter_detail['method']['name'] in ['walk', 'old-walk', 'shake-tree', '.walk', 'sos-encounter', 'roaming-grass']:
-                        return True
-    return False
+    areas = fetch_encounter_areas(pokemon_id, verbose) # Without an index check the encounters of the Pokémon itself
+    return bool(areas) and area in areas
+
+# Check if a Pokémon can be found in the wild in a grass area
+def can_be_found_in_grass(pokemon_id, verbose=True):
+    """Check if a given Pokémon can be found in the wild in a grass area.
+    :return: True if the Pokémon can be found in the grass, False otherwise.
+    """
+    return can_be_found_in_area(pokemon_id, 'grass', verbose)
 
-def can_be_found_in_water(pokemon_id):
+def can_be_found_in_water(pokemon_id, verbose=True):
     """Check if a given Pokémon can be found in the wild in a water area.
     :return: True if the Pokémon can be found in the water, False otherwise.
     """
-    if pokemon_id in LEGENDARY_POKEMON: # Don't allow legendary Pokémon to be found in the wild, only be found in Eggs
-        return False
-
-    data = fetch_from_api(f'{POKEAPI_BASE_URL}pokemon/{pokemon_id}/encounters')
+    return can_be_found_in_area(pokemon_id, 'water', verbose)
+
+def limit_catch_rate(catch_rate):
+    """Limit the catch rate to 200 otherwise it's too easy to catch the Pokémon."""
+    return min(catch_rate, 200)
+
+
+class SpeciesRepository:
+    """Looks up the Pokémon species, first in memory, then in the bundled species table and last in the API."""
+
+    def __init__(self, max_size=SPECIES_CACHE_SIZE, max_in_flight=PRELOAD_MAX_IN_FLIGHT):
+        self.max_size = max_size
+        self.max_in_flight = max_in_flight
+        self.hits = 0
+        self.misses = 0
+        self._species = OrderedDict() # Least recently used species first
+        self._lock = threading.Lock()
+
+    def _remember(self, pokemon_id):
+        """Get a species from memory and mark it as recently used, None when it's not in memory."""
+        with self._lock:
+            pokemon = self._species.get(pokemon_id)
+            if pokemon is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._species.move_to_end(pokemon_id)
+            return pokemon
 
-    if data:
-        for location in data:
-            for version_detail in location['version_details']:
-                for encounter_detail in version_detail['encounter_details']:
-                    if encounter_detail['method']['name'] in ['surf', 'rod', 'super-rod', 'fish-chain']:
-                        return True
-    return False
+    def _store(self, pokemon):
+        """Keep a species in memory, the least recently used species is forgotten when there are too many."""
+        with self._lock:
+            self._species[pokemon['id']] = pokemon
+            self._species.move_to_end(pokemon['id'])
+            while len(self._species) > self.max_size:
+                self._species.popitem(last=False)
+
+    def _load(self, pokemon_id, verbose=True):
+        """Load a species from the bundled species table, or from the API when it's not in the table.
+        :return: Dictionary with the Pokémon data. Keys: id, name, type, catch_rate. None when an error occurs.
+        """
+        species = get_species(pokemon_id)
+        if species:
+            return {
+                'id': species['id'],
+                'name': species['name'].capitalize(),
+                'type': species['type'],
+                'catch_rate': limit_catch_rate(species['capture_rate'])
+            }
 
-def extract_pokemon_data(data):
-    """Extract key the important Pokémon data from the API response.
-    :return: Dictionary with the Pokémon data. Keys: id, name, type, catch_rate.
+        data = fetch_from_api(f'{POKEAPI_BASE_URL}pokemon/{pokemon_id}', verbose)
+        species = fetch_from_api(f'{POKEAPI_BASE_URL}pokemon-species/{pokemon_id}/', verbose)
+        if not data or not species:
+            return None
+
+        return {
+            'id': int(data['id']),
+            'name': data['name'].capitalize(),
+            'type': data['types'][0]['type']['name'],
+            'catch_rate': limit_catch_rate(species.get('capture_rate', 0)) # Default to 0 if capture_rate is not found
+        }
+
+    def get(self, pokemon_id, verbose=True):
+        """Get the data of a Pokémon species.
+        :return: A new dictionary with the Pokémon data. Keys: id, name, type, catch_rate. None when an error occurs.
+        """
+        pokemon = self._remember(pokemon_id)
+        if pokemon is None:
+            pokemon = self._load(pokemon_id, verbose)
+            if pokemon is None:
+                return None
+            self._store(pokemon)
+
+        return dict(pokemon) # A copy, because the encounters change the catch rate of the Pokémon
+
+    def get_many(self, pokemon_ids, verbose=True):
+        """Get the data of multiple Pokémon species, the species that aren't in memory are loaded at the same time.
+        :return: List with a new dictionary for every id in the same order, None for the species that couldn't be loaded.
+        """
+        found = {}
+        missing = []
+        for pokemon_id in dict.fromkeys(pokemon_ids): # Every species only once, in order
+            pokemon = self._remember(pokemon_id)
+            if pokemon is None:
+                missing.append(pokemon_id)
+            else:
+                found[pokemon_id] = pokemon
+
+        if missing:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(missing))) as executor:
+                for pokemon_id, pokemon in zip(missing, executor.map(self._load, missing, [verbose] * len(missing))):
+                    if pokemon is not None:
+                        self._store(pokemon)
+                        found[pokemon_id] = pokemon
+
+        return [dict(found[pokemon_id]) if pokemon_id in found else None for pokemon_id in pokemon_ids]
+
+    def get_catch_rate(self, pokemon_id):
+        """Get the catch rate of a Pokémon species.
+        :return: The catch rate of the given Pokémon species id, 0 when the species couldn't be loaded.
+        """
+        pokemon = self.get(pokemon_id)
+        return pokemon['catch_rate'] if pokemon else 0
+
+    def stats(self):
+        """Get the number of lookups that were answered from memory (hits) and that had to be loaded (misses)."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._species)}
+
+
+species_repository = SpeciesRepository()
+
+def load_wild_pokemon(pokemon_id, type='grass', verbose=True):
+    """Load the data of a Pokémon when it can be found in the wild in the given area type (grass or water).
+    :return: Dictionary with the Pokémon data, None when it can't be found in the area.
     """
-    return {
-        'id': int(data['id']),
-        'name': data['name'].capitalize(),
-        'type': data['types'][0]['type']['name'],
-        'catch_rate': fetch_catch_rate(data['id'])
-    }
+    if type == 'water':
+        found_in_area = can_be_found_in_water(pokemon_id, verbose)
+    else:
+        found_in_area = can_be_found_in_grass(pokemon_id, verbose)
+
+    if not found_in_area:
+        return None
 
-def preload_pokemon_list(count=WILD_POKEMON_PRELOAD_COUNT, type='grass'):
+    return species_repository.get(pokemon_id, verbose)
+
+def get_wild_pokemon_candidates(type='grass', verbose=True):
+    """Get the ids of the Pokémon that can be found in the wild in the given area type (grass or water).
+    :return: List of Pokémon ids, None when it isn't known which Pokémon can be found in the area.
+    """
+    index = get_encounter_index(verbose)
+    if index and index[type]:
+        return index[type]
+
+    # Without the index, for example on a fresh install without internet, guess it from the bundled species table:
+    # water Pokémon can be found in the water and all the others in the grass.
+    candidates = [
+        pokemon_id for pokemon_id, species in load_species_table().items()
+        if pokemon_id not in LEGENDARY_POKEMON and (species['type'] == 'water') == (type == 'water')
+    ]
+    return candidates or None
+
+def preload_pokemon_list(count=WILD_POKEMON_PRELOAD_COUNT, type='grass', max_in_flight=PRELOAD_MAX_IN_FLIGHT, verbose=True):
     """Preload a list of Pokémon in advance to speed up the game for Pokémon that can be found in the wild.
+    Multiple random Pokémon are checked at the same time, with at most max_in_flight checks running at once.
     :return: List of the count of Pokémon.
     """
+    type = type.strip().lower()
     pokemon_list = []
+    attempts = 0
 
-    print(f'Loading wild {type.strip().lower().capitalize()} Pokémon', end='')
+    # With the candidates only the Pokémon that can be found in the area are picked, so no request is wasted
+    candidates = get_wild_pokemon_candidates(type, verbose)
 
-    while len(pokemon_list) < count:
-        print('.', end='')
-        pokemon_id = random.randint(1, 149)  # Limit to first-generation Pokémon for simplicity
-        if type.strip().lower() == 'water':
-            if can_be_found_in_water(pokemon_id):
-                data = fetch_from_api(f'{POKEAPI_BASE_URL}pokemon/{pokemon_id}')
-                if data:
-                    pokemon_list.append(extract_pokemon_data(data))
-        else:
-            if can_be_found_in_grass(pokemon_id):
-                data = fetch_from_api(f'{POKEAPI_BASE_URL}pokemon/{pokemon_id}')
-                if data:
-                    pokemon_list.append(extract_pokemon_data(data))
+    if verbose:
+        print(f'Loading wild {type.capitalize()} Pokémon', end='', flush=True)
+
+    if candidates:
+        # Pick all the Pokémon at once, the species that aren't known yet are loaded at the same time
+        rng = get_random('wild_pokemon')
+        pokemon_ids = [rng.choice(candidates) for _ in range(count)]
+        pokemon_list = [pokemon for pokemon in species_repository.get_many(pokemon_ids, verbose) if pokemon]
+        if verbose:
+            print('.' * len(pokemon_list))
+        return pokemon_list
 
+    max_attempts = count * PRELOAD_MAX_ATTEMPTS_PER_POKEMON # In offline mode the uncached Pokémon can never be loaded
+
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    executor = ThreadPoolExecutor(max_workers=max_in_flight)
+    in_flight = set()
+    try:
+        while len(pokemon_list) < count:
+            # Keep checking new random Pokémon until enough are found, unless the API is down
+            while len(in_flight) < max_in_flight and attempts < max_attempts and \
+                    (API_OFFLINE_MODE or api_client.is_available()):
+                attempts += 1
+                pokemon_id = get_random('wild_pokemon').randint(1, 149)  # Limit to first-generation Pokémon for simplicity
+                in_flight.add(executor.submit(load_wild_pokemon, pokemon_id, type, verbose))
+
+            if not in_flight:
+                break # Give up and play with the Pokémon already loaded
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                if verbose:
+                    print('.', end='', flush=True)
+                if future.exception() is None and future.result() and len(pokemon_list) < count:
+                    pokemon_list.append(future.result())
+    finally:
+        # Don't wait for the checks that are no longer needed, their responses still end up in the cache
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if verbose:
+        print()
     return pokemon_list
 
-def fetch_catch_rate(pokemon_id):
-    """Get the catch rate of a Pokémon species.
-    :return: The catch rate of the given Pokémon species id.
-    """
-    data = fetch_from_api(f'{POKEAPI_BASE_URL}pokemon-species/{pokemon_id}/')
-    if data:
-        catch_rate = data.get('capture_rate', 0)  # Default to 0 if capture_rate is not found
+def get_catch_chance(catch_rate, pokeball):
+    """Get the chance out of 255 to catch a Pokémon with the given catch rate and Poké Ball."""
+    catch_chance = catch_rate * 255 / 255  # Catch rate formula
+
+    # Increase the catch rate by type of pokéball used from the order of the POKEBALLS dictionary
+    catch_chance += list(POKEBALLS.keys()).index(pokeball) * POKEBALL_CATCH_BONUS
+    return catch_chance
+
+def is_caught(catch_chance, pokeball, is_shiny, catch_roll):
+    """Check if a thrown Poké Ball catches the Pokémon, catch_roll is a random number from 1 to 255."""
+    return catch_roll < catch_chance or is_shiny or pokeball == 'Master Balls'
 
-        if catch_rate > 200:  # Limit the catch rate to 200 otherwise it's too easy to catch the Pokémon
-            catch_rate = 200
+def breaks_free(break_free_roll):
+    """Check if a Pokémon that wasn't caught breaks free instead of running away, break_free_roll is a random number from 1 to 100."""
+    return break_free_roll <= BREAK_FREE_CHANCE
 
-        return catch_rate
-    return 0
+def is_shiny_chance(shiny_chance):
+    """Check if the shiny chance, a random number from 0 to the shiny rate of the player, makes the Pokémon shiny."""
+    return shiny_chance <= SHINY_CHANCE_THRESHOLD
 
 def catch_pokemon(player, pokemon, pokeball):
-    """Attempt to catch the given Pokémon.
+    """Throw a Poké Ball to attempt to catch the given Pokémon.
     :param player: The player object.
     :param pokemon: The Pokémon as a dictionary to catch.
     :param pokeball: The type of Poké Ball to use.
+    :return: 'caught', 'broke_free' or 'fled', None when the player doesn't have the Poké Ball.
     """
 
     # Check if the player has Poké Balls
     if player.get_inventory_item(pokeball) < 1:
         print(f"You don't have any {pokeball} in your bag!")
-        return
+        return None
 
 
     # Remove a Poké Ball from the player's bag
     player.set_inventory_item(pokeball, 1, 'subtract')
 
-    catch_chance = pokemon['catch_rate'] * 255 / 255  # Catch rate formula
-
-    # Increase the catch rate by type of pokéball used from the order of the POKEBALLS dictionary
-    catch_chance += list(POKEBALLS.keys()).index(pokeball) * 15
+    catch_chance = get_catch_chance(pokemon['catch_rate'], pokeball)
 
     # shake the ball
     print("\nShaking", end='')
 
     # Simulate shaking the Poké Ball by printing dots
     for i in range(3):
-        time.sleep(0.5)
+        pause(0.5)
         print('.', end='')
 
     pokemon_emoji = type_emoji.get(pokemon['type'], '❓')  # Default emoji if type not found
@@ -164,31 +557,25 @@ def catch_pokemon(player, pokemon, pokeball):
     except KeyError:
         is_shiny = False
 
-    if random.randint(1, 255) < catch_chance or is_shiny or pokeball == 'Master Balls':
+    if is_caught(catch_chance, pokeball, is_shiny, get_random('catches').randint(1, 255)):
         # Remove the unused keys from the Pokémon dictionary for optimization
         pokemon.pop('egg_used', None)
         pokemon.pop('berry_used', None)
 
         # Add the Pokémon to the player's bag
         player.add_pokemon_to_bag(pokemon)
-        time.sleep(1)
+        pause(1)
         print(f"\nYou caught {pokemon['name']} {pokemon_emoji}!")
-        time.sleep(0.5)
-
-        # ask if player wants to give a nickname
-        if player.yes_no_question("Do you want to give this Pokémon a nickname?"):
-            nickname = input("Enter a nickname: ").strip().capitalize()
-            pokemon['nickname'] = nickname
-        time.sleep(0.5)
-        print(f"Adding {pokemon['name'] if 'nickname' not in pokemon else pokemon['nickname']} to your bag.")
-        time.sleep(1)
-    elif random.randint(1, 100) <= 55: # 55% chance to break free but not run away
-        time.sleep(1)
+        pause(0.5)
+        return 'caught'
+    elif breaks_free(get_random('catches').randint(1, 100)): # 55% chance to break free but not run away
+        pause(1)
         print(f"\n{pokemon['name']} {pokemon_emoji} broke free!\n")
-        return encounter_menu(player, pokemon)
+        return 'broke_free'
     else:
-        time.sleep(1)
+        pause(1)
         print(f"{pokemon['name']} {pokemon_emoji} ran away!")
+        return 'fled'
 
 def use_pinap_berry(player):
     """Use a Pinap Berry to increase the shiny rate for the next encounter."""
@@ -208,9 +595,9 @@ def use_pinap_berry(player):
 def increase_catch_rate(pokemon, amount=25):
     """Increase the catch rate for the given Pokémon."""
     # Increase the catch rate by 25 for the next encounter but clamp it to 225
-    pokemon['catch_rate'] = max(0, min(pokemon['catch_rate'] + amount, 225))
+    pokemon['catch_rate'] = max(0, min(pokemon['catch_rate'] + amount, MAX_CATCH_RATE))
 
-def use_razz_berry(player, pokemon, amount=25, type='Razz'):
+def use_razz_berry(player, pokemon, amount=BERRY_CATCH_BONUS['Razz Berries'], type='Razz'):
     """Use a Razz Berry to increase the catch rate for the current encounter."""
 
     # check if the player has a Razz Berry in their bag
@@ -230,84 +617,163 @@ def use_razz_berry(player, pokemon, amount=25, type='Razz'):
 
         for i in range(3): # Simulate eating the Berry by printing "Yum" three times
             print("Yum ", end='')
-            time.sleep(0.5)
+            pause(0.5)
 
         print("\nYou used a Razz Berry it increased the catch rate.")
     else:
         print("You don't have any Razz Berries in your bag!")
 
 
-def encounter_menu(player, pokemon):
-    """Menu for the player to decide what to do when encountering a wild Pokémon."""
-
-    action = input("Do you want to open your bag (b)ag or (r)un?: ").strip().lower()
-    action = action[0] if len(action) > 0 else '' # Get the first character when string is not empty
+def handle_encounter_menu(encounter, action):
+    """Handle the choice in the encounter menu, open the (b)ag or (r)un."""
+    action = (action or '').strip().lower()[:1] # Only the first character counts
 
     # Retrieve the emoji based on the Pokémon's type
-    pokemon_emoji = type_emoji.get(pokemon['type'], '❓')  # Default emoji if type not found
+    pokemon_emoji = type_emoji.get(encounter.pokemon['type'], '❓')  # Default emoji if type not found
 
     if action == 'b':
-        selected_item = player.select_item_from_bag()
-
-        if selected_item in POKEBALLS:
-            catch_pokemon(player, pokemon, selected_item)
-        elif selected_item == 'Pinap Berries':
-            use_pinap_berry(player)
-            return encounter_menu(player, pokemon)
-        elif selected_item == 'Razz Berries':
-            use_razz_berry(player, pokemon)
-            return encounter_menu(player, pokemon)
-        elif selected_item == 'Golden Razz Berries':
-            use_razz_berry(player, pokemon, amount=50, type='Golden Razz')
-            return encounter_menu(player, pokemon)
-        elif selected_item == 'Eggs':
-            # You can hurt a Pokémon by throwing an egg at it to slightly increase the catch rate
-
-            # Check if not already used an egg on this pokemon encounter
-            if 'egg_used' in pokemon:
-                print("You already used an egg on this Pokémon encounter.")
-                return encounter_menu(player, pokemon)
-
-            print("You threw an egg at the Pokémon. The Pokémon got hurt but the catch rate is slightly increased.")
-            player.set_inventory_item('Eggs', 1, 'subtract')
-            increase_catch_rate(pokemon, amount=10)
-            pokemon['egg_used'] = True
-            return encounter_menu(player, pokemon)
-        else:
-            print("You can only use Poké Balls to catch a Pokémon.")
-            encounter_menu(player, pokemon)
+        return 'bag'
     elif action == 'r':
-        print(f"You successfully ran away from {pokemon['name']} {pokemon_emoji}!")
+        print(f"You successfully ran away from {encounter.pokemon['name']} {pokemon_emoji}!")
+        return 'ran_away'
+
+    print(f"{encounter.pokemon['name']} {pokemon_emoji} wants to escape while you where confused.")
+    return 'menu'
+
+def handle_encounter_bag(encounter, selected_item):
+    """Use the item selected from the bag on the Pokémon, selected_item is None when the bag was closed."""
+    player, pokemon = encounter.player, encounter.pokemon
+
+    if selected_item in POKEBALLS:
+        outcome = catch_pokemon(player, pokemon, selected_item)
+        if outcome is not None:
+            encounter.balls_thrown += 1
+        # A Pokémon that broke free can be tried again from the menu
+        return {'caught': 'nickname', 'fled': 'fled'}.get(outcome, 'menu')
+    elif selected_item == 'Pinap Berries':
+        use_pinap_berry(player)
+    elif selected_item == 'Razz Berries':
+        use_razz_berry(player, pokemon)
+    elif selected_item == 'Golden Razz Berries':
+        use_razz_berry(player, pokemon, amount=BERRY_CATCH_BONUS['Golden Razz Berries'], type='Golden Razz')
+    elif selected_item == 'Eggs':
+        # You can hurt a Pokémon by throwing an egg at it to slightly increase the catch rate
+
+        # Check if not already used an egg on this pokemon encounter
+        if 'egg_used' in pokemon:
+            print("You already used an egg on this Pokémon encounter.")
+            return 'menu'
+
+        print("You threw an egg at the Pokémon. The Pokémon got hurt but the catch rate is slightly increased.")
+        player.set_inventory_item('Eggs', 1, 'subtract')
+        increase_catch_rate(pokemon, amount=BERRY_CATCH_BONUS['Eggs'])
+        pokemon['egg_used'] = True
     else:
-        print(f"{pokemon['name']} {pokemon_emoji} wants to escape while you where confused.")
-        return encounter_menu(player, pokemon)
+        print("You can only use Poké Balls to catch a Pokémon.")
+    return 'menu'
+
+def handle_encounter_nickname(encounter, nickname):
+    """Give the caught Pokémon a nickname, an empty nickname keeps its name."""
+    pokemon = encounter.pokemon
+    nickname = (nickname or '').strip().capitalize()
+    if nickname:
+        pokemon['nickname'] = nickname
+
+    pause(0.5)
+    print(f"Adding {pokemon['name'] if 'nickname' not in pokemon else pokemon['nickname']} to your bag.")
+    pause(1)
+    return 'caught'
+
+# The handler for the action in every state of an encounter, it returns the next state
+ENCOUNTER_TRANSITIONS = {
+    'menu': handle_encounter_menu, # Action: 'b' to open the bag or 'r' to run
+    'bag': handle_encounter_bag, # Action: the item from the bag, None when the bag was closed
+    'nickname': handle_encounter_nickname, # Action: the nickname for the caught Pokémon, '' for none
+}
+FINISHED_ENCOUNTER_STATES = ('caught', 'fled', 'ran_away')
+
+class Encounter:
+    """State machine for an encounter with a wild Pokémon.
+
+    Every step handles one action of the player with the handler of the current state from ENCOUNTER_TRANSITIONS.
+    The encounter never calls itself, so a UI or a bot can drive it step by step for as long as it likes.
+    """
 
-def encounter_pokemon(player, list_pokemon, type='grass'):
-    """Encounter a random Pokémon from the list of wild Pokémon."""
+    def __init__(self, player, pokemon):
+        self.player = player
+        self.pokemon = pokemon
+        self.state = 'menu'
+        self.steps = 0
+        self.balls_thrown = 0
+
+    def is_finished(self):
+        """Check if the Pokémon was caught, fled or the player ran away."""
+        return self.state in FINISHED_ENCOUNTER_STATES
+
+    def step(self, action):
+        """Handle one action of the player in the current state.
+        :return: The next state of the encounter.
+        """
+        if not self.is_finished():
+            self.state = ENCOUNTER_TRANSITIONS[self.state](self, action)
+            self.steps += 1
+        return self.state
+
+def ask_encounter_action(encounter):
+    """Ask the player what to do in the current state of the encounter."""
+    if encounter.state == 'bag':
+        return encounter.player.select_item_from_bag()
+    elif encounter.state == 'nickname':
+        if encounter.player.yes_no_question("Do you want to give this Pokémon a nickname?"):
+            return encounter.player.ask("Enter a nickname: ")
+        return ''
+    return encounter.player.ask("Do you want to open your bag (b)ag or (r)un?: ")
+
+def play_encounter(encounter):
+    """Ask the player for actions until the encounter is over.
+    :return: The state the encounter ended in, 'caught', 'fled' or 'ran_away'.
+    """
+    while not encounter.is_finished():
+        encounter.step(ask_encounter_action(encounter))
+    return encounter.state
+
+def encounter_menu(player, pokemon):
+    """Menu for the player to decide what to do when encountering a wild Pokémon.
+    :return: The state the encounter ended in, 'caught', 'fled' or 'ran_away'.
+    """
+    return play_encounter(Encounter(player, pokemon))
+
+def encounter_pokemon(player, type='grass'):
+    """Encounter a random Pokémon from the list of wild Pokémon of the type (grass or water)."""
 
     if type.strip().lower() not in ['grass', 'water']:
         return False
 
-    # When the list is less than 1, preload more Pokémon in advance
-    if len(list_pokemon) < 1:
-        if type == 'grass':
-            new_pokemon = preload_pokemon_list(WILD_POKEMON_PRELOAD_COUNT, 'grass')
-            list_pokemon.extend(new_pokemon)
-            save_wild_pokemon_list(type.lower())
-        elif type == 'water':
-            new_pokemon = preload_pokemon_list(WILD_POKEMON_PRELOAD_COUNT, 'water')
-            list_pokemon.extend(new_pokemon)
-            save_wild_pokemon_list(type.lower())
+    pokemon = take_wild_pokemon(type)
 
-    pokemon = random.choice(list_pokemon)
-    list_pokemon.remove(pokemon)
+    if not pokemon: # Nothing could be loaded, for example in offline mode without cached Pokémon
+        print(f"There are no wild {type.lower()} Pokémon around right now.")
+        return False
 
-    random.seed(time.time())
+    return play_encounter(start_encounter(player, pokemon))
 
+def draw_wild_pokemon(type='grass'):
+    """Draw a wild Pokémon of the area type (grass or water) right away, without the preloaded lists and their files.
+    :return: Dictionary with the Pokémon data, None when no Pokémon is known for the area.
+    """
+    candidates = get_wild_pokemon_candidates(type)
+    if not candidates:
+        return None
+    return species_repository.get(get_random('wild_pokemon').choice(candidates))
+
+def start_encounter(player, pokemon):
+    """Let the wild Pokémon appear, it's shiny depending on the shiny rate of the player.
+    :return: The Encounter with the Pokémon.
+    """
     shiny_rate = player.get_shiny_rate()
     try:
         shiny_rate = int(shiny_rate)
-        shiny_chance = random.randint(0, shiny_rate)
+        shiny_chance = get_random('encounters').randint(0, shiny_rate)
     except ValueError:
         shiny_chance = 100
 
@@ -323,95 +789,270 @@ def encounter_pokemon(player, list_pokemon, type='grass'):
     # Retrieve the emoji based on the Pokémon's type
     pokemon_emoji = type_emoji.get(pokemon['type'], '❓')  # Default emoji if type not found
 
-    print(f"\nA wild {pokemon['name']} {pokemon_emoji} appears! {'✨' if shiny_chance <= 5 else ''}")
-    if shiny_chance <= 5:
+    print(f"\nA wild {pokemon['name']} {pokemon_emoji} appears! {'✨' if is_shiny_chance(shiny_chance) else ''}")
+    if is_shiny_chance(shiny_chance):
         pokemon['shiny'] = True
 
-    time.sleep(1)
+    pause(1)
+
+    return Encounter(player, pokemon)
+
+def roll_egg_pokemon_id():
+    """Roll the Pokémon id that hatches from an egg, any of the 151 Pokémon including the legendary ones."""
+    return get_random('eggs').randint(1, 151)
+
+# The egg pool of a player is shared with the prefetch worker, only change it while holding this lock
+egg_pool_lock = threading.Lock()
 
-    encounter_menu(player, pokemon)
+def refill_egg_pool(player, size=EGG_POOL_SIZE):
+    """Resolve the Pokémon of the next eggs in advance until the egg pool of the player holds size Pokémon."""
+    with egg_pool_lock:
+        missing = size - len(player.get_egg_pool())
+
+    if missing < 1:
+        return
+
+    new_pokemon = [pokemon for pokemon in species_repository.get_many([roll_egg_pokemon_id() for _ in range(missing)], verbose=False) if pokemon]
+    with egg_pool_lock:
+        player.get_egg_pool().extend(new_pokemon)
+
+def schedule_egg_pool_refill(player):
+    """Refill the egg pool of the player in the background."""
+    if not player.prefetch: # Headless games do everything in their own thread, so they can be replayed
+        return
+    # The job name is per player, a waiting refill of another player would refill the other egg pool
+    prefetch_worker.schedule(f'refill eggs of {id(player)}', lambda: refill_egg_pool(player))
 
 def fetch_random_pokemon(player):
-    """Fetch one pokemon of all the pokemon 1 / 151 including the legendary pokemon."""
-    random_id = random.randint(1, 151)
-    try:
-        response = requests.get(f'{POKEAPI_BASE_URL}pokemon/{random_id}')
-        if response.status_code == 200:
-            data = response.json()
-            pokemon_id = int(data['id'])
-            pokemon = {
-                'id': pokemon_id,
-                'name': data['name'].capitalize(),
-                'type': data['types'][0]['type']['name'],
-                'catch_rate': fetch_catch_rate(pokemon_id), # Not used in this function but for saving consistency
-                # 'caught': 'Hatched'
-            }
-            # add the pokemon to the player's bag
-            player.add_pokemon_to_bag(pokemon)
-            return pokemon
-    except Exception as e:
-        print(f"Error fetching wild Pokémon data. Is your internet connection working?")
+    """Fetch one pokemon of all the pokemon 1 / 151 including the legendary pokemon.
+    The Pokémon comes from the egg pool of the player that is filled in advance, so hatching doesn't wait for the API.
+    """
+    with egg_pool_lock:
+        egg_pool = player.get_egg_pool()
+        pokemon = egg_pool.pop() if egg_pool else None
+
+    if pokemon is None: # The egg pool couldn't keep up, resolve the egg right away
+        pokemon = species_repository.get(roll_egg_pokemon_id())
+
+    schedule_egg_pool_refill(player)
 
+    if pokemon:
+        # add the pokemon to the player's bag
+        player.add_pokemon_to_bag(pokemon)
+        return pokemon
+
+    print(f"Error fetching wild Pokémon data. Is your internet connection working?")
     return False
 
 
+class PrefetchWorker:
+    """Background thread that runs prefetch jobs, like refilling the wild Pokémon lists, while the player walks around."""
+
+    def __init__(self):
+        self._pending = {} # Jobs waiting to run by name, a dictionary keeps the order they were scheduled in
+        self._running = None
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def schedule(self, name, job):
+        """Run the job in the background. A job with the same name that is still waiting isn't scheduled twice."""
+        with self._condition:
+            self._pending.setdefault(name, job)
+            # The thread is only started when there is work for it, so importing the game stays cheap
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='prefetch-worker', daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def is_busy(self, name=None):
+        """Check if a job (or any job when no name is given) is waiting or running."""
+        with self._condition:
+            if name is None:
+                return bool(self._pending) or self._running is not None
+            return name in self._pending or self._running == name
+
+    def wait_until_idle(self, timeout=None):
+        """Block until all the scheduled jobs are done.
+        :return: True when the worker is idle, False when the timeout expired.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and self._running is None, timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending)
+                name = next(iter(self._pending))
+                job = self._pending.pop(name)
+                self._running = name
+
+            try:
+                job()
+            except Exception:
+                pass # A failed prefetch is tried again on the next trigger, the game doesn't depend on it
+            finally:
+                with self._condition:
+                    self._running = None
+                    self._condition.notify_all()
+
+
+prefetch_worker = PrefetchWorker()
+
 wild_grass_pokemon_list = []
 wild_water_pokemon_list = []
 
+# The wild Pokémon lists are shared with the prefetch worker, only change them while holding this lock
+wild_pokemon_lock = threading.RLock()
+
+# How often an encounter had to wait for the wild Pokémon to be loaded
+wild_pokemon_stats = {'encounters': 0, 'waits': 0}
+
 def get_wild_pokemon_list(pokemon_type):
     """Get the list of wild Pokémon based on type (grass or water)."""
     return wild_grass_pokemon_list if pokemon_type == 'grass' else wild_water_pokemon_list
 
 def set_wild_pokemon_list(pokemon_type, new_list):
     """Set a new list of wild Pokémon based on type (grass or water)."""
-    if pokemon_type == 'grass':
-        wild_grass_pokemon_list.clear()
-        wild_grass_pokemon_list.extend(new_list)
-    else:
-        wild_water_pokemon_list.clear()
-        wild_water_pokemon_list.extend(new_list)
+    with wild_pokemon_lock:
+        if pokemon_type == 'grass':
+            wild_grass_pokemon_list.clear()
+            wild_grass_pokemon_list.extend(new_list)
+        else:
+            wild_water_pokemon_list.clear()
+            wild_water_pokemon_list.extend(new_list)
 
-def save_wild_pokemon_list(pokemon_type):
-    """Save the list of wild Pokémon to a file based on type (grass or water)."""
+def refill_wild_pokemon_list(pokemon_type, target=WILD_POKEMON_PRELOAD_COUNT, verbose=False):
+    """Preload new wild Pokémon until the list of the type (grass or water) holds the target count again."""
+    with wild_pokemon_lock:
+        missing = target - len(get_wild_pokemon_list(pokemon_type))
 
-    if pokemon_type.strip().lower() == 'water':
-        filename = wild_water_pokemon_file
-    else:
-        filename = wild_grass_pokemon_file
+    if missing < 1:
+        return
 
+    # Don't hold the lock while loading, so encounters can keep taking Pokémon from the list
+    new_pokemon = preload_pokemon_list(missing, pokemon_type, verbose=verbose)
+    with wild_pokemon_lock:
+        # A refill in the foreground and one in the background can load at the same time, only the first fills the list
+        pokemon_list = get_wild_pokemon_list(pokemon_type)
+        new_pokemon = new_pokemon[:max(target - len(pokemon_list), 0)]
+        if new_pokemon:
+            pokemon_list.extend(new_pokemon)
+            append_wild_pokemon_list(pokemon_type, new_pokemon) # Under the same lock, so a save can't write them twice
+
+def schedule_wild_pokemon_refill(pokemon_type):
+    """Refill the list of wild Pokémon in the background when it dropped below the low watermark."""
+    with wild_pokemon_lock:
+        below_watermark = len(get_wild_pokemon_list(pokemon_type)) < WILD_POKEMON_LOW_WATERMARK
+
+    if below_watermark:
+        prefetch_worker.schedule(f'refill {pokemon_type}', lambda: refill_wild_pokemon_list(pokemon_type))
+
+def take_wild_pokemon(pokemon_type):
+    """Take a random Pokémon from the list of wild Pokémon and refill the list in the background when it gets low.
+    :return: Dictionary with the Pokémon data, None when no Pokémon could be loaded.
+    """
+    pokemon_type = pokemon_type.strip().lower()
+    ensure_wild_pokemon_list_loaded(pokemon_type)
     pokemon_list = get_wild_pokemon_list(pokemon_type)
 
-    if len(pokemon_list) < 1:
-        return
+    with wild_pokemon_lock:
+        wild_pokemon_stats['encounters'] += 1
+        is_empty = len(pokemon_list) < 1
+
+    # Only when the background refill couldn't keep up the player has to wait for the Pokémon to be loaded
+    if is_empty:
+        with wild_pokemon_lock:
+            wild_pokemon_stats['waits'] += 1
+        refill_wild_pokemon_list(pokemon_type, verbose=True)
+
+    with wild_pokemon_lock:
+        if len(pokemon_list) < 1:
+            return None
+        pokemon = get_random('encounters').choice(pokemon_list)
+        pokemon_list.remove(pokemon)
+
+    schedule_wild_pokemon_refill(pokemon_type)
+    return pokemon
+
+def get_wild_pokemon_wait_rate():
+    """Get the share of encounters that had to wait for the wild Pokémon to be loaded.
+    :return: Number between 0 and 1, 0 when there were no encounters yet.
+    """
+    if wild_pokemon_stats['encounters'] < 1:
+        return 0
+    return wild_pokemon_stats['waits'] / wild_pokemon_stats['encounters']
+
+def get_wild_pokemon_files(pokemon_type):
+    """Get the file and the file from older versions of the game of the list of wild Pokémon (grass or water)."""
+    if pokemon_type.strip().lower() == 'water':
+        return wild_water_pokemon_file, legacy_wild_water_pokemon_file
+    return wild_grass_pokemon_file, legacy_wild_grass_pokemon_file
+
+def save_wild_pokemon_list(pokemon_type, verbose=True):
+    """Save the list of wild Pokémon to a file based on type (grass or water)."""
+    filename, _ = get_wild_pokemon_files(pokemon_type)
+
+    # Hold the lock while writing, so the prefetch worker can't append to the file at the same time
+    with wild_pokemon_lock:
+        pokemon_list = get_wild_pokemon_list(pokemon_type)
+        if len(pokemon_list) < 1:
+            return
 
-    print(f"Saving wild {pokemon_type} Pokémon data", end='')
-    with open(filename, 'w') as f:
-        for pokemon in pokemon_list:
-            print('.', end='')  # Visual feedback
-            f.write(f"{pokemon['id']},{pokemon['name']},{pokemon['type']},{pokemon['catch_rate']}\n")
+        if verbose:
+            print(f"Saving wild {pokemon_type} Pokémon data...", end='')
+        write_wild_pokemon_file(filename, pokemon_list)
+    if verbose:
+        print(" Save completed.")
 
-    print("\nSave completed.")
+def append_wild_pokemon_list(pokemon_type, new_pokemon):
+    """Add new wild Pokémon to the end of the file, the full list is only written again when the game is saved."""
+    filename, _ = get_wild_pokemon_files(pokemon_type)
+    with wild_pokemon_lock:
+        append_wild_pokemon_file(filename, new_pokemon)
 
-def load_wild_pokemon_list(pokemon_type, filename, preload_count=WILD_POKEMON_PRELOAD_COUNT):
+def load_wild_pokemon_list(pokemon_type, filename=None, preload_count=WILD_POKEMON_PRELOAD_COUNT, verbose=True):
     """Load the list of wild Pokémon from a file or preload if the file doesn't exist."""
+    default_filename, legacy_filename = get_wild_pokemon_files(pokemon_type)
+    filename = filename or default_filename
     pokemon_list = get_wild_pokemon_list(pokemon_type)
-    print(f"Loading wild {pokemon_type} Pokémon data.")
+    if verbose:
+        print(f"Loading wild {pokemon_type} Pokémon data.")
+
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                data = line.strip().split(',')
-                pokemon_list.append({
-                    'id': int(data[0]),
-                    'name': data[1],
-                    'type': data[2],
-                    'catch_rate': int(data[3])
-                })
-    except FileNotFoundError:
-        print(f"No wild {pokemon_type} Pokémon data found. Preloading Pokémon data.")
-        if preload_count:
-            pokemon_list.extend(preload_pokemon_list(preload_count))
-            save_wild_pokemon_list(pokemon_type)
-    print(f"Loaded {pokemon_type} Pokémon data.")
+        loaded_pokemon = read_wild_pokemon_file(filename)
+    except ValueError:
+        loaded_pokemon = None # A damaged file is replaced by freshly preloaded Pokémon
 
-# Load the wild grass Pokémon list when the module is imported
-load_wild_pokemon_list('grass', wild_grass_pokemon_file)
\ No newline at end of file
+    if loaded_pokemon is None:
+        loaded_pokemon = migrate_legacy_wild_pokemon_file(legacy_filename, filename)
+
+    if loaded_pokemon is not None:
+        with wild_pokemon_lock:
+            pokemon_list.extend(loaded_pokemon)
+    else:
+        if verbose:
+            print(f"No wild {pokemon_type} Pokémon data found. Preloading Pokémon data.")
+        if preload_count:
+            new_pokemon = preload_pokemon_list(preload_count, pokemon_type, verbose=verbose)
+            with wild_pokemon_lock:
+                pokemon_list.extend(new_pokemon)
+            save_wild_pokemon_list(pokemon_type, verbose=verbose)
+    if verbose:
+        print(f"Loaded {pokemon_type} Pokémon data.")
+
+    schedule_wild_pokemon_refill(pokemon_type)
+
+# The wild Pokémon lists are loaded the first time they're needed, not when the module is imported
+wild_pokemon_loaded = set()
+wild_pokemon_load_lock = threading.Lock()
+
+def ensure_wild_pokemon_list_loaded(pokemon_type, verbose=True):
+    """Load the list of wild Pokémon of the type (grass or water) if it isn't loaded yet."""
+    with wild_pokemon_load_lock:
+        if pokemon_type not in wild_pokemon_loaded:
+            load_wild_pokemon_list(pokemon_type, verbose=verbose)
+            wild_pokemon_loaded.add(pokemon_type)
+
+def schedule_wild_pokemon_load(pokemon_type):
+    """Load the list of wild Pokémon of the type (grass or water) in the background, before the first encounter."""
+    prefetch_worker.schedule(f'load {pokemon_type}', lambda: ensure_wild_pokemon_list_loaded(pokemon_type, verbose=False))
@@ -0,0 +1,177 @@
+import os
+import shutil
+import sys
+
+from config import TILES, VIEWPORT_MIN_SIZE, SHOW_MINIMAP, MINIMAP_SIZE
+
+TILE_TEXTS = [emoji + ' ' for emoji in TILES] # Every tile is drawn as its emoji and a space, the player without space
+
+# ANSI escape sequences, these replace starting a clear/cls process for every screen
+CLEAR_SCREEN = '\x1b[H\x1b[2J' # Move the cursor to the top left and clear the whole screen
+CLEAR_LINE_END = '\x1b[K' # Clear the rest of the line, for a row that became shorter
+CLEAR_BELOW = '\x1b[J' # Clear everything below the cursor, the previous prompt and messages
+TILE_CELLS = 3 # Terminal columns of one tile, the emoji is 2 columns wide
+MESSAGE_LINES = 10 # Lines below the map for the prompt and the messages, a frame is redrawn completely without them
+
+def move_cursor(row):
+    """Get the escape sequence that moves the cursor to the start of the row of the screen, the top row is 0."""
+    return f'\x1b[{row + 1};1H'
+
+def get_viewport(map_rows, map_cols, position, view_rows, view_cols):
+    """Get the part of the map that is drawn, centered on the position and kept inside the map at the edges.
+    :return: Tuple with the top row, the left column, the number of rows and the number of columns.
+    """
+    rows, cols = min(view_rows, map_rows), min(view_cols, map_cols)
+    top = min(max(position[0] - rows // 2, 0), map_rows - rows)
+    left = min(max(position[1] - cols // 2, 0), map_cols - cols)
+    return top, left, rows, cols
+
+def render_minimap(map, position, skin, size=MINIMAP_SIZE):
+    """Get the rows of a small version of the map, every tile of it is the tile in the middle of its part of the map.
+    Only the tiles of the minimap are looked at, so it takes as long for every size of map.
+    """
+    rows, cols = min(size[0], map.rows), min(size[1], map.cols)
+    player_row, player_col = position[0] * rows // map.rows, position[1] * cols // map.cols
+    sampled_cols = [(2 * col + 1) * map.cols // (2 * cols) for col in range(cols)]
+
+    lines = []
+    for row in range(rows):
+        sampled_row = (2 * row + 1) * map.rows // (2 * rows)
+        texts = [TILE_TEXTS[map.get(sampled_row, col)] for col in sampled_cols]
+        if row == player_row:
+            texts[player_col] = skin
+        lines.append(''.join(texts))
+    return lines
+
+
+class Renderer:
+    """Draws the map as frames, every frame is composed as one string and written at once.
+
+    Only the part of the map around the player that fits on the screen is drawn, so drawing a frame takes as long for
+    every size of map. The text of every drawn row is cached until a tile of it changes, and when the screen still shows
+    the previous frame only the rows that are different are redrawn.
+    """
+
+    def __init__(self, output=None, ansi=None, screen_size=None, minimap=SHOW_MINIMAP):
+        self.output = output # sys.stdout at the time of writing when None, so redirect_stdout works
+        # The console of PyCharm doesn't understand the escape sequences
+        self.ansi = "PYCHARM_HOSTED" not in os.environ if ansi is None else ansi
+        self.ansi_enabled = False
+        self.screen_size = screen_size # Lines and columns of the screen, the size of the terminal when None
+        self.minimap = minimap
+        self.map = None
+        self.row_cache = {} # Per drawn row of the map: the left column, the tiles and the text that was rendered for them
+        self.screen = None # The rows on the screen, None when the screen doesn't show the last frame
+
+    def write(self, text):
+        """Write the text to the output in one go."""
+        if self.ansi and not self.ansi_enabled and os.name == 'nt':
+            os.system('') # Once, makes the Windows console understand the escape sequences
+        self.ansi_enabled = True
+
+        output = self.output or sys.stdout
+        output.write(text)
+        output.flush()
+
+    def invalidate(self):
+        """Forget what is on the screen, for when something else was shown. The next frame is drawn completely."""
+        self.screen = None
+
+    def clear(self):
+        """Clear the screen, the next frame is drawn completely."""
+        self.invalidate()
+        self.write(CLEAR_SCREEN if self.ansi else "\n" * 100)
+
+    def get_screen_size(self):
+        """Get the lines and columns of the screen."""
+        if self.screen_size:
+            return self.screen_size
+        size = shutil.get_terminal_size()
+        return size.lines, size.columns
+
+    def get_view_size(self, map):
+        """Get the rows and columns of the map that fit on the screen, and if the minimap is shown below them.
+        :return: Tuple with the rows, the columns and True when the minimap is shown.
+        """
+        lines, columns = self.get_screen_size()
+        view_rows = max(lines - MESSAGE_LINES, VIEWPORT_MIN_SIZE[0])
+        view_cols = max(columns // TILE_CELLS, VIEWPORT_MIN_SIZE[1])
+
+        # The minimap is only useful when the map doesn't fit, it takes its rows and an empty line from the view
+        show_minimap = self.minimap and not map.endless and (map.rows > view_rows or map.cols > view_cols)
+        if show_minimap:
+            view_rows = max(view_rows - min(MINIMAP_SIZE[0], map.rows) - 1, VIEWPORT_MIN_SIZE[0])
+        return view_rows, view_cols, show_minimap
+
+    def render_row(self, map, row, left, cols):
+        """Get the text of the drawn part of a row, it's only rendered again when a tile of it changed or the view moved."""
+        tiles = map.get_row(row, left, cols)
+        cached = self.row_cache.get(row)
+        if cached is None or cached[0] != left or cached[1] != tiles:
+            cached = (left, bytes(tiles), ''.join([TILE_TEXTS[tile] for tile in tiles]))
+        return cached
+
+    def render_map(self, map, position, skin):
+        """Get the rows of the frame for the part of the map around the player at the position.
+        :return: Tuple with the rows of the frame and the number of columns of the map in them.
+        """
+        if map is not self.map:
+            # Another map, or a new map after generating one
+            self.map = map
+            self.row_cache = {}
+
+        view_rows, view_cols, show_minimap = self.get_view_size(map)
+        top, left, rows, cols = get_viewport(map.rows, map.cols, position, view_rows, view_cols)
+
+        # Only the drawn rows are kept in the cache, so it never grows bigger than the view
+        row_cache = {row: self.render_row(map, row, left, cols) for row in range(top, top + rows)}
+        self.row_cache = row_cache
+        lines = [row_cache[row][2] for row in range(top, top + rows)]
+
+        row, col = position
+        if top <= row < top + rows and left <= col < left + cols:
+            tiles = row_cache[row][1]
+            lines[row - top] = ''.join([TILE_TEXTS[tile] for tile in tiles[:col - left]]) + skin + \
+                               ''.join([TILE_TEXTS[tile] for tile in tiles[col - left + 1:]])
+
+        if show_minimap:
+            minimap_size = (MINIMAP_SIZE[0], min(MINIMAP_SIZE[1], view_cols))
+            lines += [''] + render_minimap(map, position, skin, minimap_size)
+        return lines, cols
+
+    def fits_screen(self, lines, cols):
+        """Check if the frame and the messages fit on the screen, a frame that scrolls or wraps can't be redrawn by row."""
+        screen_lines, columns = self.get_screen_size()
+        return len(lines) + MESSAGE_LINES <= screen_lines and cols * TILE_CELLS <= columns
+
+    def draw(self, lines, cols):
+        """Draw the rows of a frame, by redrawing the rows that changed when the screen still shows the last frame."""
+        if not self.ansi:
+            frame = '\n'.join(lines) + '\n'
+        elif self.screen is None or len(self.screen) != len(lines) or not self.fits_screen(lines, cols):
+            frame = CLEAR_SCREEN + '\n'.join(lines) + '\n'
+        else:
+            changed = [move_cursor(row) + line + CLEAR_LINE_END for row, line in enumerate(lines) if line != self.screen[row]]
+            frame = ''.join(changed) + move_cursor(len(lines)) + CLEAR_BELOW
+
+        self.screen = lines if self.ansi else None
+        self.write(frame)
+
+    def draw_map(self, map, position, skin):
+        """Draw the part of the map around the player at the position."""
+        self.draw(*self.render_map(map, position, skin))
+
+
+renderer = Renderer()
+
+def draw_map(map, position, skin):
+    """Draw the map with the player on the screen."""
+    renderer.draw_map(map, position, skin)
+
+def invalidate_screen():
+    """Draw the next frame completely, because the screen shows something else than the map."""
+    renderer.invalidate()
+
+def clear_screen():
+    """Clear the screen with an escape sequence instead of a clear/cls process."""
+    renderer.clear()
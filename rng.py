@@ -0,0 +1,50 @@
+import random
+from contextlib import contextmanager
+
+from config import RANDOM_SEED
+
+# The subsystems that get their own random number generator, so using one never changes the numbers of another
+RANDOM_STREAMS = ('map', 'spawns', 'wild_pokemon', 'encounters', 'catches', 'eggs', 'network')
+
+
+class RandomStreams:
+    """Independent random number generators per subsystem, all derived from one session seed.
+
+    With the same seed every subsystem gets the same numbers in the same order, so a whole session can be replayed.
+    """
+
+    def __init__(self, seed=None):
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        """Start all the streams again from the seed, a random seed is picked when it's None."""
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2 ** 63)
+        self._streams = {}
+
+    def get(self, name):
+        """Get the random number generator of a subsystem, it's created from the session seed on first use."""
+        stream = self._streams.get(name)
+        if stream is None:
+            if name not in RANDOM_STREAMS:
+                raise ValueError(f"Unknown random stream: {name}")
+            # A string seed is hashed with SHA-512, so the streams don't depend on PYTHONHASHSEED or the process
+            stream = random.Random(f'{self.seed}:{name}')
+            self._streams[name] = stream
+        return stream
+
+
+random_streams = RandomStreams(RANDOM_SEED)
+
+@contextmanager
+def use_random_streams(streams):
+    """Draw the random numbers from other streams inside the with block, for example for one of many games in a process."""
+    global random_streams
+    previous, random_streams = random_streams, streams
+    try:
+        yield streams
+    finally:
+        random_streams = previous
+
+def get_random(name):
+    """Get the random number generator of a subsystem from the session streams."""
+    return random_streams.get(name)
@@ -0,0 +1,73 @@
+import heapq
+import math
+from itertools import count
+
+from config import DEBUG_MODE
+
+def ticks_until(chance, rng):
+    """Draw after how many ticks an event happens that has the chance to happen on every tick, the same as rolling the
+    chance on every tick but with one random number."""
+    if chance >= 1:
+        return 1
+    return 1 + int(math.log(1.0 - rng.random()) / math.log(1.0 - chance))
+
+
+class EventScheduler:
+    """Timer queue of the events of the world, like items spawning and seeds growing, at the world tick they are due.
+
+    The events are kept in a heap by their tick, so advancing the world only handles the events that are due, and the
+    world advances by ticks of the game instead of when the screen is drawn. A handler that fails doesn't stop the game,
+    unless raise_errors is set, like with POKEMON_DEBUG, so the bug shows up where it happens.
+    """
+
+    def __init__(self, raise_errors=DEBUG_MODE):
+        self.raise_errors = raise_errors
+        self.tick = 0
+        self.queue = [] # Heap of (tick, order, handler, arguments, next_delay)
+        self.order = count() # Events that are due at the same tick are handled in the order they were scheduled
+
+    def __len__(self):
+        return len(self.queue)
+
+    def push(self, tick, handler, arguments, next_delay=None):
+        """Add an event to the queue at the tick."""
+        heapq.heappush(self.queue, (tick, next(self.order), handler, arguments, next_delay))
+
+    def schedule(self, delay, handler, *arguments):
+        """Call the handler with the arguments once, when the world advanced by delay ticks, at least one."""
+        self.push(self.tick + max(delay, 1), handler, arguments)
+
+    def schedule_repeating(self, next_delay, handler, *arguments):
+        """Call the handler with the arguments again and again, next_delay() draws the ticks until the next call."""
+        self.push(self.tick + max(next_delay(), 1), handler, arguments, next_delay)
+
+    def advance(self, ticks=1):
+        """Advance the world by the ticks and handle the events that became due, a handler can schedule new events.
+
+        While an event is handled the tick is the tick the event was due, so the events it schedules and the next call
+        of a repeating event count from there, also when the world advances by more than one tick at once. The next
+        call of a repeating event is scheduled before the handler runs, so a handler that fails still repeats.
+        :return: Number of events that were handled.
+        """
+        end = self.tick + ticks
+        handled = 0
+        while self.queue and self.queue[0][0] <= end:
+            tick, _, handler, arguments, next_delay = heapq.heappop(self.queue)
+            self.tick = tick
+            if next_delay:
+                self.push(tick + max(next_delay(), 1), handler, arguments, next_delay)
+
+            try:
+                handler(*arguments)
+            except Exception as error:
+                if self.raise_errors:
+                    raise
+                print(f"Something went wrong in the world: {error}") # The other events and the game go on
+            handled += 1
+
+        self.tick = end
+        return handled
+
+    def clear(self):
+        """Forget all the events."""
+        self.queue = []
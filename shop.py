@@ -1,6 +1,5 @@
-import time
-
 from config import ITEM_EMOJIS
+from pacing import pause
 
 pokemart_items = [
     ("Poké Balls", 25),
@@ -31,10 +30,10 @@ def display_menu():
             print(f"{key}. {item}")
 
 
-def get_player_choice():
+def get_player_choice(player):
     """Gets the player's menu choice and validates it."""
     try:
-        choice = input("What would you like to get?: ").strip().lower()
+        choice = player.ask("What would you like to get?: ").strip().lower()
         if choice in ["l", "q"]: # (l)eave or (q)uit
             return "leave"
         elif not choice.isdigit() and len(choice) > 3: # If the input is not a number and longer than 3 characters (probably a item name)
@@ -77,7 +76,7 @@ def handle_purchase_confirmation(player, item_name, item_price, quantity):
 def handle_item_purchase(player, choice):
     """Handles the process of purchasing an item from the PokéMart."""
     item_name, item_price = pokemart_items[choice]
-    quantity = input(f"How many {item_name} would you like to buy?: ").strip()
+    quantity = player.ask(f"How many {item_name} would you like to buy?: ").strip()
 
     try:
         quantity = int(quantity)
@@ -95,7 +94,7 @@ def pokemart_buy(player):
     shopping = True
     while shopping:
         display_menu()
-        choice = get_player_choice()
+        choice = get_player_choice(player)
         if choice == "leave":
             print("Thank you for visiting the PokéMart!")
             shopping = False
@@ -131,7 +130,7 @@ def pokemart_sell(player):
         return
 
     # Prompt player for quantity and display the price information
-    quantity = input(f"How many {item} would you like to sell? (Price per {item}: {price_per_item} coins): ").strip()
+    quantity = player.ask(f"How many {item} would you like to sell? (Price per {item}: {price_per_item} coins): ").strip()
 
     try:
         quantity = int(quantity)
@@ -174,14 +173,14 @@ def show_pokecenter_menu(player):
 def show_professor_house_menu():
     """Displays the Professor's house menu."""
     print("You entered the Professor's lab!")
-    time.sleep(1)
+    pause(1)
     print('...', end='')
-    time.sleep(1)
+    pause(1)
     print(' ...', end='')
-    time.sleep(1)
+    pause(1)
     print(' ...')
-    time.sleep(1)
+    pause(1)
     print('The professor is not here')
-    time.sleep(1)
+    pause(1)
     print('Looks like you have to come back in a later version of this game.')
-    time.sleep(1.5)
\ No newline at end of file
+    pause(1.5)
\ No newline at end of file
@@ -0,0 +1,218 @@
+import numpy as np
+
+from config import POKEBALLS, LEGENDARY_POKEMON, POKEBALL_CATCH_BONUS, BREAK_FREE_CHANCE, MAX_CATCH_RATE, \
+    BERRY_CATCH_BONUS, SHINY_CHANCE_THRESHOLD
+from pokemon import limit_catch_rate, get_catch_chance, is_caught, breaks_free, is_shiny_chance, increase_catch_rate
+from species_data import load_species_table
+
+# What the player feeds the Pokémon before the first throw, one Berry and one Egg can be used per encounter
+BERRY_POLICIES = {
+    'none': (),
+    'razz': ('Razz Berries',),
+    'golden': ('Golden Razz Berries',),
+    'egg': ('Eggs',),
+    'razz+egg': ('Razz Berries', 'Eggs'),
+    'golden+egg': ('Golden Razz Berries', 'Eggs'),
+}
+
+MAX_THROWS = 32 # A Pokémon that broke free 32 times in a row (0.55^32) is counted as unresolved
+BATCH_SIZE = 100_000 # Encounters simulated at once, keeps the roll matrices at a few hundred MB at most
+VERIFY_SHINY_RATE = 10 # Low shiny rate for verify, so about half of the Pokémon are shiny and both branches are hit
+
+POKEBALL_NAMES = list(POKEBALLS.keys())
+MASTER_BALL_INDEX = POKEBALL_NAMES.index('Master Balls')
+
+def get_wild_species(species_table=None):
+    """Get the species that can be encountered in the wild, the legendary Pokémon only hatch from eggs.
+    :return: Tuple with an array of the Pokémon ids and an array of their catch rates as used by the game.
+    """
+    species_table = load_species_table() if species_table is None else species_table
+    species = [entry for pokemon_id, entry in sorted(species_table.items()) if pokemon_id not in LEGENDARY_POKEMON]
+    pokemon_ids = np.array([entry['id'] for entry in species], dtype=np.int64)
+    catch_rates = np.array([limit_catch_rate(entry['capture_rate']) for entry in species], dtype=np.int64)
+    return pokemon_ids, catch_rates
+
+def parse_ball_mix(ball_mix):
+    """Parse a ball mix like {'Poké Balls': 3, 'Great Balls': 1} into probabilities in the order of POKEBALLS."""
+    weights = np.array([float(ball_mix.get(pokeball, 0)) for pokeball in POKEBALL_NAMES])
+    unknown = set(ball_mix) - set(POKEBALL_NAMES)
+    if unknown or weights.sum() <= 0 or (weights < 0).any():
+        raise ValueError(f"Invalid ball mix: {ball_mix}")
+    return weights / weights.sum()
+
+def draw_rolls(rng, count, species_count, shiny_rate, ball_probabilities, max_throws=MAX_THROWS):
+    """Draw all the random numbers for count encounters, with the same ranges the game uses.
+    :return: Dictionary with the species index, shiny roll, and the ball, catch roll and break free roll of every throw.
+    """
+    return {
+        'species': rng.integers(0, species_count, size=count),
+        'shiny': rng.integers(0, shiny_rate, size=count, endpoint=True), # random.randint(0, shiny_rate)
+        'balls': rng.choice(len(POKEBALL_NAMES), size=(count, max_throws), p=ball_probabilities),
+        'catch': rng.integers(1, 255, size=(count, max_throws), endpoint=True), # random.randint(1, 255)
+        'break_free': rng.integers(1, 100, size=(count, max_throws), endpoint=True), # random.randint(1, 100)
+    }
+
+def apply_berry_policy(catch_rates, berry_policy):
+    """Increase the catch rates like increase_catch_rate does for every Berry and Egg of the policy."""
+    catch_rates = catch_rates.copy()
+    for item in BERRY_POLICIES[berry_policy]:
+        catch_rates = np.clip(catch_rates + BERRY_CATCH_BONUS[item], 0, MAX_CATCH_RATE)
+    return catch_rates
+
+def simulate_rolls(rolls, catch_rates):
+    """Play the encounters of the rolls at once.
+    :param catch_rates: The catch rate of every encounter after the Berries.
+    :return: Dictionary with per encounter: shiny, caught, fled and the number of thrown balls.
+    """
+    shiny = rolls['shiny'] <= SHINY_CHANCE_THRESHOLD
+    catch_chance = catch_rates[:, None] + rolls['balls'] * POKEBALL_CATCH_BONUS
+
+    caught_by_throw = (rolls['catch'] < catch_chance) | shiny[:, None] | (rolls['balls'] == MASTER_BALL_INDEX)
+    broke_free_by_throw = ~caught_by_throw & (rolls['break_free'] <= BREAK_FREE_CHANCE)
+
+    # A ball is only thrown when the Pokémon broke free from all the balls before it
+    thrown = np.ones_like(caught_by_throw)
+    thrown[:, 1:] = np.cumprod(broke_free_by_throw[:, :-1], axis=1, dtype=bool)
+
+    return {
+        'shiny': shiny,
+        'caught': (thrown & caught_by_throw).any(axis=1),
+        'fled': (thrown & ~caught_by_throw & ~broke_free_by_throw).any(axis=1),
+        'balls_thrown': thrown.sum(axis=1),
+    }
+
+def simulate(n=1_000_000, ball_mix=None, berry_policy='none', shiny_rate=100, species_table=None, seed=None,
+             batch_size=BATCH_SIZE):
+    """Simulate n encounters with wild Pokémon where the player throws balls until it's caught or ran away.
+    :param ball_mix: Dictionary with the relative amount of every Poké Ball thrown, only Poké Balls by default.
+    :param berry_policy: Key of BERRY_POLICIES, what is used before the first ball.
+    :return: Dictionary with the statistics of the simulation, including per species catch probabilities.
+    """
+    ball_probabilities = parse_ball_mix(ball_mix or {'Poké Balls': 1})
+    if berry_policy not in BERRY_POLICIES:
+        raise ValueError(f"Unknown berry policy: {berry_policy}")
+
+    pokemon_ids, base_catch_rates = get_wild_species(species_table)
+    if len(pokemon_ids) == 0:
+        raise ValueError("The species table is empty.")
+    catch_rates = apply_berry_policy(base_catch_rates, berry_policy)
+
+    rng = np.random.default_rng(seed)
+    encounters = np.zeros(len(pokemon_ids), dtype=np.int64)
+    catches = np.zeros(len(pokemon_ids), dtype=np.int64)
+    totals = {'shiny': 0, 'caught': 0, 'fled': 0, 'balls_thrown': 0}
+
+    for start in range(0, n, batch_size):
+        rolls = draw_rolls(rng, min(batch_size, n - start), len(pokemon_ids), shiny_rate, ball_probabilities)
+        result = simulate_rolls(rolls, catch_rates[rolls['species']])
+        for key in totals:
+            totals[key] += int(result[key].sum())
+        encounters += np.bincount(rolls['species'], minlength=len(pokemon_ids))
+        catches += np.bincount(rolls['species'], weights=result['caught'], minlength=len(pokemon_ids)).astype(np.int64)
+
+    species_encounters = np.maximum(encounters, 1)
+    return {
+        'encounters': n,
+        'catch_probability': totals['caught'] / n,
+        'flee_probability': totals['fled'] / n,
+        'unresolved': n - totals['caught'] - totals['fled'],
+        'shiny_probability': totals['shiny'] / n,
+        'balls_per_encounter': totals['balls_thrown'] / n,
+        'balls_per_catch': totals['balls_thrown'] / totals['caught'] if totals['caught'] else float('inf'),
+        'species_catch_probability': dict(zip(pokemon_ids.tolist(), (catches / species_encounters).tolist())),
+    }
+
+def play_rolls(rolls, index, catch_rate, berry_policy):
+    """Play one encounter of the rolls with the functions the game itself uses.
+    :return: Tuple with shiny, caught, fled and the number of thrown balls.
+    """
+    pokemon = {'catch_rate': catch_rate}
+    for item in BERRY_POLICIES[berry_policy]:
+        increase_catch_rate(pokemon, amount=BERRY_CATCH_BONUS[item])
+
+    is_shiny = is_shiny_chance(int(rolls['shiny'][index]))
+    for throw in range(rolls['balls'].shape[1]):
+        pokeball = POKEBALL_NAMES[rolls['balls'][index, throw]]
+        catch_chance = get_catch_chance(pokemon['catch_rate'], pokeball)
+        if is_caught(catch_chance, pokeball, is_shiny, int(rolls['catch'][index, throw])):
+            return is_shiny, True, False, throw + 1
+        if not breaks_free(int(rolls['break_free'][index, throw])):
+            return is_shiny, False, True, throw + 1
+    return is_shiny, False, False, rolls['balls'].shape[1]
+
+def verify(n=100_000, shiny_rate=VERIFY_SHINY_RATE, species_table=None, seed=0):
+    """Check that the vectorized simulation gives exactly the same outcome as the game for every encounter.
+    :return: Number of encounters with a different outcome.
+    """
+    pokemon_ids, base_catch_rates = get_wild_species(species_table)
+    # Every ball, so the Master Ball branch is hit often
+    ball_probabilities = parse_ball_mix({pokeball: 1 for pokeball in POKEBALL_NAMES})
+    rng = np.random.default_rng(seed)
+
+    mismatches = 0
+    for berry_policy in BERRY_POLICIES:
+        catch_rates = apply_berry_policy(base_catch_rates, berry_policy)
+        rolls = draw_rolls(rng, n, len(pokemon_ids), shiny_rate, ball_probabilities)
+        result = simulate_rolls(rolls, catch_rates[rolls['species']])
+
+        for index in range(n):
+            expected = play_rolls(rolls, index, int(base_catch_rates[rolls['species'][index]]), berry_policy)
+            actual = (bool(result['shiny'][index]), bool(result['caught'][index]), bool(result['fled'][index]),
+                      int(result['balls_thrown'][index]))
+            if expected != actual:
+                mismatches += 1
+                if mismatches <= 10:
+                    print(f"Mismatch ({berry_policy}, encounter {index}): game {expected}, simulation {actual}")
+    return mismatches
+
+def print_report(stats, show_species=10):
+    """Print the statistics of a simulation, with the species that are the hardest to catch."""
+    print(f"Encounters:               {stats['encounters']:,}")
+    print(f"Catch probability:        {stats['catch_probability']:.4%}")
+    print(f"Flee probability:         {stats['flee_probability']:.4%}")
+    print(f"Unresolved:               {stats['unresolved']:,}")
+    print(f"Shiny probability:        {stats['shiny_probability']:.4%}")
+    print(f"Balls per encounter:      {stats['balls_per_encounter']:.3f}")
+    print(f"Balls per caught Pokémon:  {stats['balls_per_catch']:.3f}")
+
+    if show_species:
+        species_table = load_species_table()
+        print("Hardest to catch:")
+        hardest = sorted(stats['species_catch_probability'].items(), key=lambda item: item[1])[:show_species]
+        for pokemon_id, probability in hardest:
+            name = species_table.get(pokemon_id, {}).get('name', pokemon_id)
+            print(f"  {name:<16} {probability:.2%}")
+
+def main():
+    """Simulate encounters for balancing: python simulator.py [-n N] [--balls 'Poké Balls=3,Great Balls=1'] [--berries razz]"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of catching wild Pokémon.")
+    parser.add_argument('-n', type=int, default=1_000_000, help="Number of encounters to simulate")
+    parser.add_argument('--balls', default='Poké Balls=1', help="Ball mix as name=weight pairs separated by commas")
+    parser.add_argument('--berries', choices=list(BERRY_POLICIES), default='none', help="Berries used before the first ball")
+    parser.add_argument('--shiny-rate', type=int, help="Shiny rate of the player (45 to 100), 100 by default and "
+                                                        f"{VERIFY_SHINY_RATE} for --verify")
+    parser.add_argument('--seed', type=int, help="Seed for reproducible results")
+    parser.add_argument('--verify', action='store_true', help="Check the simulation against the game logic instead")
+    args = parser.parse_args()
+
+    if args.verify:
+        shiny_rate = VERIFY_SHINY_RATE if args.shiny_rate is None else args.shiny_rate
+        mismatches = verify(min(args.n, 100_000), shiny_rate, seed=args.seed or 0)
+        if mismatches:
+            print(f"{mismatches} encounters differ from the game logic.")
+            raise SystemExit(1)
+        print("The simulation matches the game logic for every encounter.")
+        return
+
+    try:
+        ball_mix = {name.strip(): float(weight) for name, weight in (pair.split('=') for pair in args.balls.split(','))}
+        shiny_rate = 100 if args.shiny_rate is None else args.shiny_rate
+        stats = simulate(args.n, ball_mix, args.berries, shiny_rate, seed=args.seed)
+    except ValueError as error:
+        parser.error(str(error))
+    print_report(stats)
+
+if __name__ == '__main__':
+    main()
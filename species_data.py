@@ -0,0 +1,130 @@
+import json
+import os
+import struct
+
+from config import POKEAPI_BASE_URL, species_data_file, PRELOAD_MAX_IN_FLIGHT
+
+SPECIES_FILE_MAGIC = b'PKSP'
+SPECIES_FILE_VERSION = 1
+FIRST_GENERATION_IDS = range(1, 152)
+
+HEADER = struct.Struct('<4sBBH') # magic, version, number of types, number of species
+TYPE_NAME = struct.Struct('<10s') # type names, the records refer to them by their index
+RECORD = struct.Struct('<HBB16s') # id, capture rate, type index, name
+
+# The first-generation species (id, name, primary type and capture rate) by id, loaded on first use
+species_table = None
+
+def pack_species_table(species):
+    """Pack a list of species dictionaries (id, name, type, capture_rate) into the binary table format."""
+    types = sorted({entry['type'] for entry in species})
+    parts = [HEADER.pack(SPECIES_FILE_MAGIC, SPECIES_FILE_VERSION, len(types), len(species))]
+    parts += [TYPE_NAME.pack(type_name.encode('ascii')) for type_name in types]
+    for entry in sorted(species, key=lambda entry: entry['id']):
+        parts.append(RECORD.pack(entry['id'], entry['capture_rate'], types.index(entry['type']), entry['name'].encode('utf-8')))
+    return b''.join(parts)
+
+def unpack_species_table(data):
+    """Unpack the binary table format.
+    :return: Dictionary with the species dictionaries (id, name, type, capture_rate) by id.
+    """
+    magic, version, type_count, species_count = HEADER.unpack_from(data)
+    if magic != SPECIES_FILE_MAGIC or version != SPECIES_FILE_VERSION:
+        raise ValueError("Unsupported species table format.")
+
+    offset = HEADER.size
+    types = []
+    for _ in range(type_count):
+        types.append(TYPE_NAME.unpack_from(data, offset)[0].rstrip(b'\0').decode('ascii'))
+        offset += TYPE_NAME.size
+
+    records = data[offset:offset + species_count * RECORD.size]
+    return {
+        pokemon_id: {'id': pokemon_id, 'name': name.rstrip(b'\0').decode('utf-8'), 'type': types[type_index], 'capture_rate': capture_rate}
+        for pokemon_id, capture_rate, type_index, name in RECORD.iter_unpack(records)
+    }
+
+def load_species_table(filename=species_data_file):
+    """Load the bundled species table, it's only read from the disk once.
+    :return: Dictionary with the species by id, empty when the table is missing or unreadable.
+    """
+    global species_table
+    if species_table is None:
+        try:
+            with open(filename, 'rb') as f:
+                species_table = unpack_species_table(f.read())
+        except (OSError, ValueError, struct.error):
+            species_table = {}
+    return species_table
+
+def get_species(pokemon_id):
+    """Get a species from the bundled table.
+    :return: Dictionary with the id, name, type and capture_rate of the species, None when it's not in the table.
+    """
+    return load_species_table().get(pokemon_id)
+
+def read_mirror_file(mirror, endpoint):
+    """Read an endpoint from a local PokeAPI mirror, laid out like the PokeAPI api-data repository."""
+    path = os.path.join(mirror, endpoint.strip('/'), 'index.json')
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def fetch_species(pokemon_id, mirror=None):
+    """Fetch the species data from the PokeAPI, or from the local mirror when it's given.
+    :return: Dictionary with the id, name, type and capture_rate of the species, None when it couldn't be fetched.
+    """
+    if mirror:
+        pokemon = read_mirror_file(mirror, f'pokemon/{pokemon_id}')
+        species = read_mirror_file(mirror, f'pokemon-species/{pokemon_id}')
+    else:
+        from pokemon import fetch_from_api # Only the builder needs the API
+
+        pokemon = fetch_from_api(f'{POKEAPI_BASE_URL}pokemon/{pokemon_id}')
+        species = fetch_from_api(f'{POKEAPI_BASE_URL}pokemon-species/{pokemon_id}/')
+
+    if not pokemon or not species:
+        return None
+
+    return {
+        'id': int(pokemon['id']),
+        'name': pokemon['name'],
+        'type': pokemon['types'][0]['type']['name'],
+        'capture_rate': int(species.get('capture_rate', 0)),
+    }
+
+def build_species_table(mirror=None, filename=species_data_file):
+    """Build the species table for all first-generation Pokémon and write it to the file.
+    :return: True when the table was written, False when not all species could be fetched.
+    """
+    from concurrent.futures import ThreadPoolExecutor # Only the builder needs it, importing the table stays cheap
+
+    with ThreadPoolExecutor(max_workers=PRELOAD_MAX_IN_FLIGHT) as executor:
+        species = list(executor.map(lambda pokemon_id: fetch_species(pokemon_id, mirror), FIRST_GENERATION_IDS))
+
+    missing = [pokemon_id for pokemon_id, entry in zip(FIRST_GENERATION_IDS, species) if entry is None]
+    if missing:
+        print(f"Couldn't fetch the species: {', '.join(map(str, missing))}. The table is not written.")
+        return False
+
+    with open(filename, 'wb') as f:
+        f.write(pack_species_table(species))
+    print(f"Written {len(species)} species to {filename}.")
+    return True
+
+def main():
+    """Rebuild the bundled species table: python species_data.py [--mirror DIRECTORY] [--output FILE]"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the bundled Pokémon species table.")
+    parser.add_argument('--mirror', help="Directory with a local PokeAPI mirror (containing pokemon/ and pokemon-species/)")
+    parser.add_argument('--output', default=species_data_file, help="File to write the table to")
+    args = parser.parse_args()
+
+    if not build_species_table(args.mirror, args.output):
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
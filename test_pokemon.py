@@ -0,0 +1,17 @@
+import pokemon
+
+
+def test_take_wild_pokemon_counts_the_waits(monkeypatch):
+    monkeypatch.setattr(pokemon, 'wild_pokemon_loaded', {'grass', 'water'})
+    monkeypatch.setattr(pokemon, 'wild_grass_pokemon_list', [{'id': 1, 'name': 'Bulbasaur'}])
+    monkeypatch.setattr(pokemon, 'wild_pokemon_stats', {'encounters': 0, 'waits': 0})
+    monkeypatch.setattr(pokemon, 'schedule_wild_pokemon_refill', lambda pokemon_type: None)
+    # The refill can't keep up: nothing is loaded when the list is empty
+    monkeypatch.setattr(pokemon, 'preload_pokemon_list', lambda *args, **kwargs: [])
+
+    assert pokemon.take_wild_pokemon('grass')['id'] == 1
+    assert pokemon.wild_pokemon_stats == {'encounters': 1, 'waits': 0}
+
+    assert pokemon.take_wild_pokemon('grass') is None
+    assert pokemon.wild_pokemon_stats == {'encounters': 2, 'waits': 1}
+    assert pokemon.get_wild_pokemon_wait_rate() == 0.5
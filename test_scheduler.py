@@ -0,0 +1,26 @@
+import pytest
+
+from scheduler import EventScheduler
+
+
+def fail():
+    raise RuntimeError("broken handler")
+
+
+def test_failing_handler_repeats_and_the_world_goes_on():
+    scheduler = EventScheduler(raise_errors=False)
+    calls = []
+    scheduler.schedule_repeating(lambda: 2, fail)
+    scheduler.schedule_repeating(lambda: 3, calls.append, 'grown')
+
+    assert scheduler.advance(6) == 5
+    assert calls == ['grown', 'grown']
+    assert scheduler.tick == 6
+
+
+def test_failing_handler_raises_when_debugging():
+    scheduler = EventScheduler(raise_errors=True)
+    scheduler.schedule(1, fail)
+
+    with pytest.raises(RuntimeError):
+        scheduler.advance()
@@ -0,0 +1,15 @@
+import numpy as np
+
+from pokemon import is_shiny_chance
+from simulator import verify, draw_rolls, parse_ball_mix, POKEBALL_NAMES, VERIFY_SHINY_RATE
+
+
+def test_simulation_matches_game_logic():
+    assert verify(n=2000, seed=0) == 0
+
+
+def test_verify_rolls_shiny_and_normal_pokemon():
+    ball_probabilities = parse_ball_mix({pokeball: 1 for pokeball in POKEBALL_NAMES})
+    rolls = draw_rolls(np.random.default_rng(0), 2000, 10, VERIFY_SHINY_RATE, ball_probabilities)
+    shiny = [is_shiny_chance(int(shiny_chance)) for shiny_chance in rolls['shiny']]
+    assert any(shiny) and not all(shiny)
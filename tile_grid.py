@@ -0,0 +1,189 @@
+from config import TILES, COLLISION_OBJECTS, INTERACTION_OBJECTS, GRASS_OBJECTS, WATER_OBJECTS, SPAWNABLE_OBJECTS
+
+# Properties of the tiles, every tile has a bitmask of them in TILE_FLAGS
+COLLISION = 1
+INTERACTION = 2
+GRASS = 4
+WATER = 8
+SPAWNABLE = 16
+
+TILE_CODES = {emoji: code for code, emoji in enumerate(TILES)}
+TILE_FLAGS = bytes(
+    COLLISION * (emoji in COLLISION_OBJECTS) | INTERACTION * (emoji in INTERACTION_OBJECTS) |
+    GRASS * (emoji in GRASS_OBJECTS) | WATER * (emoji in WATER_OBJECTS) | SPAWNABLE * (emoji in SPAWNABLE_OBJECTS)
+    for emoji in TILES
+)
+
+EMPTY = TILE_CODES['  ']
+TREE = TILE_CODES['🌳']
+WAVE = TILE_CODES['🌊']
+GRASS_TILE = TILE_CODES['🌿']
+POKEMART = TILE_CODES['🏪']
+POKECENTER = TILE_CODES['⛑️']
+PROFESSOR_HOUSE = TILE_CODES['🏠']
+ISLAND = TILE_CODES['🏝️']
+FOREST = TILE_CODES['🌲']
+EGG = TILE_CODES['🥚']
+COINS = TILE_CODES['💰']
+SEED = TILE_CODES['🌱']
+
+# Tiles that are rare on a map but are looked for on every step, their positions are kept in a PositionSet
+INDEXED_TILES = (SEED,) + tuple(TILE_CODES[emoji] for emoji in dict.fromkeys(SPAWNABLE_OBJECTS))
+SAMPLE_ATTEMPTS = 64 # Random tiles checked to find a tile that isn't indexed, before all the tiles are scanned
+
+def tile_codes(emojis):
+    """Convert a list of emoji, like GROWABLE_BERRIES, to their tile codes."""
+    return [TILE_CODES[emoji] for emoji in emojis]
+
+
+class PositionSet:
+    """Set of tile indexes that can add, remove and pick a random index in constant time."""
+
+    __slots__ = ('items', 'slots')
+
+    def __init__(self, items=()):
+        self.items = list(items)
+        self.slots = {item: slot for slot, item in enumerate(self.items)} # Where every index is in items
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.slots
+
+    def add(self, item):
+        """Add the index when it's not in the set yet."""
+        if item not in self.slots:
+            self.slots[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item):
+        """Remove the index by moving the last index into its slot, so nothing has to shift."""
+        slot = self.slots.pop(item, None)
+        if slot is None:
+            return
+        last = self.items.pop()
+        if slot < len(self.items):
+            self.items[slot] = last
+            self.slots[last] = slot
+
+    def sample(self, rng):
+        """Pick a random index, None when the set is empty."""
+        return self.items[rng.randrange(len(self.items))] if self.items else None
+
+
+def record_change(changes, row, col, tile):
+    """Keep the tile as the last change of the position, moved to the end so the changes are in the order of the writes."""
+    changes.pop((row, col), None)
+    changes[(row, col)] = tile
+
+
+class TileGrid:
+    """Map of rows x cols tiles, stored as one tile code per byte. The emoji are only looked up to draw the map.
+
+    Every write keeps the number of tiles of each type and the positions of the INDEXED_TILES up to date, so finding or
+    picking a random tile doesn't scan the map. When changes is a dictionary, every write is kept in it as the last tile of
+    its (row, col) position, so a generated map can be saved as how it was generated and what changed since.
+    """
+
+    __slots__ = ('rows', 'cols', 'tiles', 'counts', 'indexed', 'generation', 'changes', 'writes')
+    endless = False
+
+    def __init__(self, rows, cols, tiles=None):
+        self.rows = rows
+        self.cols = cols
+        self.tiles = bytearray(rows * cols) if tiles is None else bytearray(tiles) # Row after row, all EMPTY by default
+        if len(self.tiles) != rows * cols:
+            raise ValueError(f"A {rows}x{cols} map needs {rows * cols} tiles, not {len(self.tiles)}.")
+
+        self.counts = [self.tiles.count(tile) for tile in range(len(TILES))]
+        self.indexed = {tile: PositionSet(self.find_all(tile)) for tile in INDEXED_TILES}
+        self.generation = None # How the map was generated, set by generate_map
+        self.changes = None # Last tile of every position written since the map was generated, None when they aren't kept
+        self.writes = 0 # Number of writes, the last written position is the last in changes
+
+    @classmethod
+    def from_emoji(cls, emoji_rows):
+        """Create a grid from a map as a list of rows with emoji, like the maps of older versions."""
+        return cls(len(emoji_rows), len(emoji_rows[0]), (TILE_CODES[emoji] for row in emoji_rows for emoji in row))
+
+    def in_bounds(self, row, col):
+        """Check if the position is on the map."""
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def get(self, row, col):
+        """Get the tile code at the position."""
+        return self.tiles[row * self.cols + col]
+
+    def set(self, row, col, tile):
+        """Place the tile code at the position."""
+        index = row * self.cols + col
+        previous = self.tiles[index]
+        if previous == tile:
+            return
+
+        self.tiles[index] = tile
+        if self.changes is not None:
+            record_change(self.changes, row, col, tile)
+        self.writes += 1
+        self.counts[previous] -= 1
+        self.counts[tile] += 1
+        if previous in self.indexed:
+            self.indexed[previous].discard(index)
+        if tile in self.indexed:
+            self.indexed[tile].add(index)
+
+    def get_row(self, row, left, cols):
+        """Get the tile codes of cols tiles of a row, from the left column."""
+        start = row * self.cols + left
+        return self.tiles[start:start + cols]
+
+    def has_flag(self, row, col, flag):
+        """Check if the tile at the position has the property, like COLLISION or GRASS."""
+        return TILE_FLAGS[self.tiles[row * self.cols + col]] & flag != 0
+
+    def emoji(self, row, col):
+        """Get the emoji of the tile at the position."""
+        return TILES[self.tiles[row * self.cols + col]]
+
+    def contains(self, tile):
+        """Check if the tile code is anywhere on the map."""
+        return self.counts[tile] > 0
+
+    def count(self, tile):
+        """Get the number of tiles with the tile code."""
+        return self.counts[tile]
+
+    def find_all(self, tile):
+        """Get the indexes of all the tiles with the tile code by scanning the map."""
+        indexes = []
+        index = self.tiles.find(tile)
+        while index != -1:
+            indexes.append(index)
+            index = self.tiles.find(tile, index + 1)
+        return indexes
+
+    def positions_of(self, tile):
+        """Get all the positions with the tile code, row after row."""
+        indexes = sorted(self.indexed[tile].items) if tile in self.indexed else self.find_all(tile)
+        return [divmod(index, self.cols) for index in indexes]
+
+    def random_position(self, tile, rng):
+        """Pick a random position with the tile code.
+        :return: Tuple with the row and column, None when the tile isn't on the map.
+        """
+        if self.counts[tile] == 0:
+            return None
+        if tile in self.indexed:
+            return divmod(self.indexed[tile].sample(rng), self.cols)
+
+        # Common tiles like the open path are found by trying random tiles, with a scan when the tile is too rare
+        for _ in range(SAMPLE_ATTEMPTS):
+            index = rng.randrange(len(self.tiles))
+            if self.tiles[index] == tile:
+                return divmod(index, self.cols)
+        return divmod(rng.choice(self.find_all(tile)), self.cols)
+
+    def to_emoji(self):
+        """Get the map as a list of rows with emoji."""
+        return [[TILES[tile] for tile in self.tiles[row * self.cols:(row + 1) * self.cols]] for row in range(self.rows)]
@@ -0,0 +1,110 @@
+import os
+import struct
+
+WILD_POKEMON_FILE_MAGIC = b'PKWL'
+WILD_POKEMON_FILE_VERSION = 1
+
+HEADER = struct.Struct('<4sHH') # magic, version, record size
+RECORD = struct.Struct('<HBB16s') # id, catch rate, type index, name
+
+# The records refer to the Pokémon types by their index, only add new types at the end
+POKEMON_TYPES = (
+    'normal', 'fire', 'water', 'grass', 'electric', 'ice', 'fighting', 'poison', 'ground',
+    'flying', 'psychic', 'bug', 'rock', 'ghost', 'dragon', 'dark', 'steel', 'fairy',
+)
+UNKNOWN_TYPE = 255
+
+def pack_wild_pokemon(pokemon_list):
+    """Pack a list of Pokémon dictionaries (id, name, type, catch_rate) into fixed-width records."""
+    return b''.join(
+        RECORD.pack(
+            pokemon['id'],
+            max(0, min(pokemon['catch_rate'], 255)),
+            POKEMON_TYPES.index(pokemon['type']) if pokemon['type'] in POKEMON_TYPES else UNKNOWN_TYPE,
+            pokemon['name'].encode('utf-8')[:RECORD.size - 4]
+        )
+        for pokemon in pokemon_list
+    )
+
+def unpack_wild_pokemon(records):
+    """Unpack fixed-width records into a list of Pokémon dictionaries (id, name, type, catch_rate)."""
+    return [
+        {
+            'id': pokemon_id,
+            'name': name.rstrip(b'\0').decode('utf-8', 'ignore'),
+            'type': POKEMON_TYPES[type_index] if type_index < len(POKEMON_TYPES) else 'unknown',
+            'catch_rate': catch_rate
+        }
+        for pokemon_id, catch_rate, type_index, name in RECORD.iter_unpack(records)
+    ]
+
+def write_wild_pokemon_file(filename, pokemon_list):
+    """Write the full list of Pokémon to the file in one go, replacing the previous file."""
+    data = HEADER.pack(WILD_POKEMON_FILE_MAGIC, WILD_POKEMON_FILE_VERSION, RECORD.size) + pack_wild_pokemon(pokemon_list)
+    temporary_filename = f'{filename}.tmp'
+    with open(temporary_filename, 'wb') as f:
+        f.write(data)
+    os.replace(temporary_filename, filename) # A crash while saving never leaves a half written file behind
+
+def append_wild_pokemon_file(filename, pokemon_list):
+    """Append Pokémon to the end of the file without rewriting the Pokémon that are already in it."""
+    if not os.path.exists(filename):
+        write_wild_pokemon_file(filename, pokemon_list)
+        return
+
+    with open(filename, 'ab') as f:
+        f.write(pack_wild_pokemon(pokemon_list))
+
+def read_wild_pokemon_file(filename):
+    """Read the list of Pokémon from the file.
+    :return: List of Pokémon dictionaries, None when the file doesn't exist.
+    """
+    try:
+        with open(filename, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+
+    if len(data) < HEADER.size:
+        raise ValueError(f"Unsupported wild Pokémon file: {filename}")
+
+    magic, version, record_size = HEADER.unpack_from(data)
+    if magic != WILD_POKEMON_FILE_MAGIC or version != WILD_POKEMON_FILE_VERSION or record_size != RECORD.size:
+        raise ValueError(f"Unsupported wild Pokémon file: {filename}")
+
+    # Ignore a record at the end that was only partly written
+    end = HEADER.size + (len(data) - HEADER.size) // RECORD.size * RECORD.size
+    return unpack_wild_pokemon(memoryview(data)[HEADER.size:end])
+
+def read_legacy_wild_pokemon_file(filename):
+    """Read the list of Pokémon from the old comma separated file format.
+    :return: List of Pokémon dictionaries, None when the file doesn't exist.
+    """
+    pokemon_list = []
+    try:
+        with open(filename, 'r') as f:
+            for line in f:
+                data = line.strip().split(',')
+                if len(data) < 4:
+                    continue
+                pokemon_list.append({
+                    'id': int(data[0]),
+                    'name': ','.join(data[1:-2]), # The name is everything between the id and the type
+                    'type': data[-2],
+                    'catch_rate': int(data[-1])
+                })
+    except FileNotFoundError:
+        return None
+    return pokemon_list
+
+def migrate_legacy_wild_pokemon_file(legacy_filename, filename):
+    """Convert the old comma separated file to the binary file format and remove the old file.
+    :return: List of Pokémon dictionaries from the old file, None when there is no old file.
+    """
+    pokemon_list = read_legacy_wild_pokemon_file(legacy_filename)
+    if pokemon_list is None:
+        return None
+
+    write_wild_pokemon_file(filename, pokemon_list)
+    os.remove(legacy_filename)
+    return pokemon_list
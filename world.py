@@ -0,0 +1,187 @@
+import os
+import random
+import tempfile
+from collections import OrderedDict
+
+from config import TILES, WORLD_CHUNK_SIZE, WORLD_SIZE_IN_CHUNKS, WORLD_MAX_LOADED_CHUNKS, WORLD_CHUNK_MAX_GROVES, \
+    WORLD_CHUNK_GROVE_RADIUS, WORLD_CHUNK_STRUCTURE_CHANCE
+from tile_grid import TileGrid, TILE_FLAGS, EMPTY, TREE, POKEMART, POKECENTER, record_change
+
+
+class ChunkedWorld:
+    """Endless map that is generated in chunks of chunk_size x chunk_size tiles, every chunk is a TileGrid.
+
+    A chunk is generated from the world seed and its position when it's first used, so it's the same every time. At most
+    max_chunks chunks are kept in memory: when another chunk is needed the least recently used chunk is dropped, and
+    written to disk first when it changed. Memory use doesn't grow with how far the player walks.
+
+    It has the same methods as TileGrid, but contains, count, random_position and positions_of only look at the chunks
+    in memory, which are the chunks around the player.
+    """
+
+    endless = True
+
+    def __init__(self, seed, map_type='grassland', density=0.4, chunk_size=WORLD_CHUNK_SIZE,
+                 size_in_chunks=WORLD_SIZE_IN_CHUNKS, max_chunks=WORLD_MAX_LOADED_CHUNKS):
+        self.seed = seed
+        self.map_type = map_type
+        self.density = density
+        self.chunk_size = chunk_size
+        self.rows = self.cols = size_in_chunks * chunk_size
+        self.max_chunks = max_chunks
+
+        self.chunks = OrderedDict() # The chunks in memory, the least recently used first
+        self.changed = set() # Chunks in memory that changed since they were generated or read from disk
+        self.spilled = set() # Chunks that are written to disk, they are read instead of generated again
+        self.spill_directory = None # Temporary directory, created when the first changed chunk is dropped
+        self.counts = [0] * len(TILES) # Number of tiles of each type in the chunks in memory
+        self.generation = None # How the world was generated, set by generate_world
+        self.changes = None # Last tile of every position written since the world was generated, None when they aren't kept
+        self.writes = 0 # Number of writes, the last written position is the last in changes
+
+    def get_spawn_position(self):
+        """Get the position where the player starts, in the middle of the world."""
+        return [self.rows // 2, self.cols // 2]
+
+    def generate_chunk(self, chunk_row, chunk_col):
+        """Generate the tiles of a chunk, the same for the same seed and position."""
+        from map import generate_terrain # map imports this module
+
+        rng = random.Random(f'{self.seed}:{chunk_row}:{chunk_col}')
+        size = self.chunk_size
+        tiles = generate_terrain(size, size, self.map_type, self.density, rng, edges=False)
+        if self.map_type == 'grassland':
+            self.decorate_chunk(tiles, rng)
+        return tiles
+
+    def decorate_chunk(self, tiles, rng):
+        """Grow groves of trees on the tiles of a grassland chunk, and sometimes place a 🏪 or ⛑️ with free tiles around
+        it, so the grassland far from the start isn't only grass.
+        """
+        size = self.chunk_size
+        for _ in range(rng.randint(0, WORLD_CHUNK_MAX_GROVES)):
+            center_row, center_col = rng.randrange(size), rng.randrange(size)
+            radius = rng.randint(1, WORLD_CHUNK_GROVE_RADIUS)
+            for row in range(max(center_row - radius, 0), min(center_row + radius + 1, size)):
+                for col in range(max(center_col - radius, 0), min(center_col + radius + 1, size)):
+                    # Not every tile of a grove is a tree, so there's a way through it
+                    if abs(row - center_row) + abs(col - center_col) <= radius and rng.random() < 0.7:
+                        tiles[row * size + col] = TREE
+
+        if rng.random() < WORLD_CHUNK_STRUCTURE_CHANCE:
+            row, col = rng.randrange(1, size - 1), rng.randrange(1, size - 1)
+            for neighbour_row, neighbour_col in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+                tiles[neighbour_row * size + neighbour_col] = EMPTY
+            tiles[row * size + col] = rng.choice((POKEMART, POKECENTER))
+
+    def get_chunk_path(self, key):
+        """Get the file a dropped chunk is written to."""
+        return os.path.join(self.spill_directory.name, f'{key[0]}_{key[1]}.chunk')
+
+    def spill_chunk(self, key, chunk):
+        """Write the tiles of a chunk to disk, so the changes are kept when it's dropped from memory."""
+        if self.spill_directory is None:
+            self.spill_directory = tempfile.TemporaryDirectory(prefix='pokemon_world_') # Removed with the world
+        with open(self.get_chunk_path(key), 'wb') as file:
+            file.write(chunk.tiles)
+        self.spilled.add(key)
+
+    def get_chunk(self, chunk_row, chunk_col):
+        """Get a chunk from memory, from disk or by generating it."""
+        key = (chunk_row, chunk_col)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        if key in self.spilled:
+            with open(self.get_chunk_path(key), 'rb') as file:
+                chunk = TileGrid(self.chunk_size, self.chunk_size, file.read())
+        else:
+            chunk = TileGrid(self.chunk_size, self.chunk_size, self.generate_chunk(chunk_row, chunk_col))
+
+        self.chunks[key] = chunk
+        for tile, count in enumerate(chunk.counts):
+            self.counts[tile] += count
+        while len(self.chunks) > self.max_chunks:
+            old_key, old_chunk = self.chunks.popitem(last=False)
+            for tile, count in enumerate(old_chunk.counts):
+                self.counts[tile] -= count
+            if old_key in self.changed:
+                self.spill_chunk(old_key, old_chunk)
+                self.changed.discard(old_key)
+        return chunk
+
+    def in_bounds(self, row, col):
+        """Check if the position is in the world."""
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def get(self, row, col):
+        """Get the tile code at the position."""
+        size = self.chunk_size
+        return self.get_chunk(row // size, col // size).get(row % size, col % size)
+
+    def set(self, row, col, tile):
+        """Place the tile code at the position."""
+        size = self.chunk_size
+        key = (row // size, col // size)
+        chunk = self.get_chunk(*key)
+        previous = chunk.get(row % size, col % size)
+        if previous == tile:
+            return
+
+        chunk.set(row % size, col % size, tile)
+        if self.changes is not None:
+            record_change(self.changes, row, col, tile)
+        self.writes += 1
+        self.counts[previous] -= 1
+        self.counts[tile] += 1
+        self.changed.add(key)
+
+    def has_flag(self, row, col, flag):
+        """Check if the tile at the position has the property, like COLLISION or GRASS."""
+        return TILE_FLAGS[self.get(row, col)] & flag != 0
+
+    def emoji(self, row, col):
+        """Get the emoji of the tile at the position."""
+        return TILES[self.get(row, col)]
+
+    def get_row(self, row, left, cols):
+        """Get the tile codes of cols tiles of a row, from the left column."""
+        size = self.chunk_size
+        tiles = bytearray()
+        col = left
+        while col < left + cols:
+            chunk = self.get_chunk(row // size, col // size)
+            start = (row % size) * size + col % size
+            length = min(size - col % size, left + cols - col) # To the end of the chunk or of the row
+            tiles += chunk.tiles[start:start + length]
+            col += length
+        return tiles
+
+    def contains(self, tile):
+        """Check if the tile code is anywhere in the chunks in memory."""
+        return self.counts[tile] > 0
+
+    def count(self, tile):
+        """Get the number of tiles with the tile code in the chunks in memory."""
+        return self.counts[tile]
+
+    def positions_of(self, tile):
+        """Get all the positions with the tile code in the chunks in memory."""
+        size = self.chunk_size
+        return [(chunk_row * size + row, chunk_col * size + col)
+                for (chunk_row, chunk_col), chunk in self.chunks.items() for row, col in chunk.positions_of(tile)]
+
+    def random_position(self, tile, rng):
+        """Pick a random position with the tile code in the chunks in memory.
+        :return: Tuple with the row and column, None when the tile isn't in the chunks in memory.
+        """
+        keys = [key for key, chunk in self.chunks.items() if chunk.count(tile) > 0]
+        if not keys:
+            return None
+
+        # A chunk with more of the tiles is picked more often, so every tile has the same chance
+        key = rng.choices(keys, weights=[self.chunks[key].count(tile) for key in keys])[0]
+        row, col = self.chunks[key].random_position(tile, rng)
+        return key[0] * self.chunk_size + row, key[1] * self.chunk_size + col